@@ -1,27 +1,245 @@
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import sqlite3
-from datetime import datetime, timezone
-from typing import Optional
+import sys
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache, wraps
+from typing import Callable, Optional
 
 from fastapi import FastAPI, Form, Request
-from fastapi.responses import HTMLResponse, Response, FileResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, Response, FileResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+import anyio.to_thread
+
+try:
+    import brotli
+except ImportError:  # optional: gzip-only variants without it
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: locks below only cover threads in one process
+    fcntl = None
 
 
 import os
+import queue
 import threading
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from openpyxl import Workbook, load_workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
 import base64
+import bisect
+import csv
+import gzip
 import hashlib
 import hmac
+import html
+import io
+import itertools
+import json
+import logging
+import math
+import mimetypes
+import mmap
+import re
 import time
+import urllib.parse
+import zlib
+
+logger = logging.getLogger("parmis")
+
+
+# -----------------------------
+# Metrics (Prometheus text format, served on /metrics)
+# Each series has a fixed offset into a float64 row of an anonymous shared
+# mapping created at import. serve.py forks its workers after import and gives
+# each its own row (set_metrics_slot), so workers never contend across processes
+# and /metrics on any of them reports the sum over all rows. Under plain
+# `uvicorn --workers` every process has a private mapping and reports itself.
+# An observation is a bisect plus three float adds under a per-process lock.
+# -----------------------------
+METRICS_MAX_WORKERS = 64
+METRICS_ROW_SIZE = 4096  # float64 values per worker row
+# If set, /metrics needs "Authorization: Bearer <token>"; REQUIRED in production.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Rows 0..METRICS_MAX_WORKERS-1 hold per-worker counters; the extra last row
+# holds gauges, which are process-independent (last write wins).
+_metrics_mem = mmap.mmap(-1, (METRICS_MAX_WORKERS + 1) * METRICS_ROW_SIZE * 8)
+_metrics_values = memoryview(_metrics_mem).cast("d")
+_metrics_base = 0
+_metrics_lock = threading.Lock()
+_metrics_allocated = 0
+_metrics_registry: list = []
+
+
+def set_metrics_slot(slot: int) -> None:
+    """Selects the row this process writes to (one per live serve.py worker)."""
+    global _metrics_base
+    if not 0 <= slot < METRICS_MAX_WORKERS:
+        raise ValueError(f"metrics slot {slot} out of range (METRICS_MAX_WORKERS={METRICS_MAX_WORKERS})")
+    _metrics_base = slot * METRICS_ROW_SIZE
+
+
+def _metrics_alloc(n: int) -> int:
+    global _metrics_allocated
+    offset = _metrics_allocated
+    _metrics_allocated += n
+    if _metrics_allocated > METRICS_ROW_SIZE:
+        raise RuntimeError("METRICS_ROW_SIZE is too small for the registered series")
+    return offset
+
+
+def _metric_total(offset: int) -> float:
+    return sum(_metrics_values[offset::METRICS_ROW_SIZE][:METRICS_MAX_WORKERS])
+
+
+def _metric_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)] + ([extra] if extra else [])
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+# Per-request span totals (span name -> seconds) for the Server-Timing header;
+# set by MetricsMiddleware, None outside a request (e.g. the lead writer thread).
+_request_spans: contextvars.ContextVar[dict | None] = contextvars.ContextVar("request_spans", default=None)
+SERVER_TIMING_SPANS = ("render", "db", "excel")
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram. Label value tuples are registered up front
+    (add_labels) so every worker lays its row out identically; observations
+    with unregistered labels go to `fallback`, or are dropped without one.
+    Observations made inside a request also add to its Server-Timing `span`.
+    """
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS,
+                 fallback: tuple | None = None, span: str | None = None):
+        self.name, self.help, self.labelnames, self.buckets = name, help, labelnames, buckets
+        self.fallback = fallback
+        self.span = span
+        self._offsets: dict[tuple, int] = {}
+        self.add_labels(fallback if labelnames else ())
+        _metrics_registry.append(self)
+
+    def add_labels(self, *labelsets: tuple) -> None:
+        for values in labelsets:
+            if values is not None and values not in self._offsets:
+                self._offsets[values] = _metrics_alloc(len(self.buckets) + 3)  # buckets, +Inf, sum, count
+
+    def observe(self, value: float, *labels) -> None:
+        if self.span is not None:
+            spans = _request_spans.get()
+            if spans is not None:
+                spans[self.span] = spans.get(self.span, 0.0) + value
+        offset = self._offsets.get(labels)
+        if offset is None:
+            offset = self._offsets.get(self.fallback)
+            if offset is None:
+                return
+        i = _metrics_base + offset
+        n = len(self.buckets)
+        with _metrics_lock:
+            _metrics_values[i + bisect.bisect_left(self.buckets, value)] += 1
+            _metrics_values[i + n + 1] += value
+            _metrics_values[i + n + 2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *labels)
+
+    def expose(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        n = len(self.buckets)
+        for values, offset in self._offsets.items():
+            cumulative = 0.0
+            for k, le in enumerate(self.buckets + ("+Inf",)):
+                cumulative += _metric_total(offset + k)
+                bucket = _metric_labels(self.labelnames, values, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative:g}")
+            labels = _metric_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_metric_total(offset + n + 1):.6f}")
+            lines.append(f"{self.name}_count{labels} {_metric_total(offset + n + 2):g}")
+        return lines
+
+
+class Gauge:
+    """A single process-independent value (last write wins)."""
+
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._index = METRICS_MAX_WORKERS * METRICS_ROW_SIZE + _metrics_alloc(1)
+        _metrics_registry.append(self)
+
+    def set(self, value: float) -> None:
+        _metrics_values[self._index] = value
+
+    def expose(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge",
+                f"{self.name} {_metrics_values[self._index]:g}"]
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in _metrics_registry for line in metric.expose()) + "\n"
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte, by route.",
+    ("method", "route"), fallback=("other", "other"),
+)
+PAGE_RENDER_SECONDS = Histogram(
+    "page_render_seconds", "Time spent in page() building the HTML shell (page-cache misses only).",
+    ("path",), fallback=("other",), span="render",
+)
+DB_CONNECT_SECONDS = Histogram(
+    "sqlite_connect_seconds", "Opening a pooled SQLite connection incl. PRAGMAs.", span="db",
+)
+DB_INSERT_SECONDS = Histogram("sqlite_lead_insert_seconds", "INSERTs for one group-commit batch of leads.")
+DB_COMMIT_SECONDS = Histogram("sqlite_lead_commit_seconds", "COMMIT of one group-commit batch of leads.")
+LEAD_BATCH_ROWS = Histogram(
+    "sqlite_lead_batch_rows", "Leads per group-commit transaction.", buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+LEAD_COMMIT_WAIT_SECONDS = Histogram(
+    "quote_commit_wait_seconds", "Time /api/quote waits for its lead's group commit to be durable.", span="db",
+)
+EXCEL_JOURNAL_APPEND_SECONDS = Histogram(
+    "excel_journal_append_seconds", "Appending one lead to leads.journal.", span="excel",
+)
+EXCEL_LOCK_WAIT_SECONDS = Histogram(
+    "excel_lock_wait_seconds", "Waiting for _excel_lock (+ file lock) to compact.", span="excel",
+)
+EXCEL_LOCK_HOLD_SECONDS = Histogram(
+    "excel_lock_hold_seconds", "Holding _excel_lock (+ file lock) while compacting.", span="excel",
+)
+EXCEL_LOAD_SECONDS = Histogram("excel_load_workbook_seconds", "openpyxl load_workbook(leads.xlsx).")
+EXCEL_SAVE_SECONDS = Histogram("excel_save_seconds", "openpyxl wb.save of leads.xlsx (+ atomic rename).")
+EXCEL_ROWS = Gauge("leads_xlsx_rows", "Lead rows in leads.xlsx after the last compaction.")
 
 
 EXCEL_PATH = "leads.xlsx"
-_excel_lock = threading.Lock()
+LEADS_JOURNAL_PATH = "leads.journal"
+EXCEL_COMPACT_INTERVAL_SECONDS = float(os.getenv("EXCEL_COMPACT_INTERVAL_SECONDS", "5"))
+# Thread locks serialize within a process; the flock()ed .lock files extend the
+# same guarantees across uvicorn workers sharing the working directory.
+_excel_lock = threading.Lock()    # serializes load_workbook/save (compaction only)
+_journal_lock = threading.Lock()  # serializes journal appends + rotation
+EXCEL_LOCK_PATH = EXCEL_PATH + ".lock"
+JOURNAL_LOCK_PATH = LEADS_JOURNAL_PATH + ".lock"
+_compactor_stop = threading.Event()
+_compactor_thread: threading.Thread | None = None
 
 EXCEL_HEADERS = [
     "created_at",
@@ -34,26 +252,181 @@ EXCEL_HEADERS = [
     "ip",
 ]
 
+def xlsx_cell(value):
+    """
+    A value openpyxl will write. XML 1.0 forbids most control characters, so
+    they become visible \\xNN escapes instead of failing the whole save.
+    """
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub(lambda m: f"\\x{ord(m.group()):02x}", value)
+    return value
+
+
+@contextmanager
+def _file_lock(path: str, shared: bool = False, blocking: bool = True):
+    """
+    flock() on `path` (created if missing). Yields False instead of waiting
+    when `blocking` is off and another holder conflicts.
+    """
+    if fcntl is None:
+        yield True
+        return
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        flags = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        try:
+            fcntl.flock(fd, flags if blocking else flags | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        yield True
+    finally:
+        os.close(fd)  # releases the lock
+
+
 def append_lead_to_excel(lead: dict) -> None:
     """
-    Appends a lead to leads.xlsx (creates file + headers if missing).
-    Thread-safe for concurrent requests.
+    Records a lead in the append-only journal (one JSON line per lead).
+    The background compactor folds the journal into leads.xlsx in batches,
+    so this stays O(1) no matter how large the workbook has grown.
+    Appenders share the journal lock; rotation takes it exclusively, so no
+    worker can be mid-write into a journal that is being folded.
+    """
+    line = (json.dumps({h: lead.get(h, "") for h in EXCEL_HEADERS}, ensure_ascii=False) + "\n").encode("utf-8")
+    with EXCEL_JOURNAL_APPEND_SECONDS.time(), _journal_lock, _file_lock(JOURNAL_LOCK_PATH, shared=True):
+        fd = os.open(LEADS_JOURNAL_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+
+def _read_journal(path: str) -> list[list]:
+    rows = []
+    with open(path, "rb") as f:
+        for raw in f:
+            try:
+                lead = json.loads(raw)
+            except ValueError:
+                continue  # torn trailing line from a crash mid-write
+            rows.append([xlsx_cell(lead.get(h, "")) for h in EXCEL_HEADERS])
+    return rows
+
+
+def compact_leads_excel(wait: bool = True) -> int:
+    """
+    Folds pending journal rows into leads.xlsx and returns how many were added.
+    The journal is rotated aside first so submitters never wait on openpyxl, and
+    the workbook is replaced atomically so readers always see a complete file.
+    One process compacts at a time; with wait=False (background ticks) a run
+    that finds another worker compacting returns 0 instead of queueing behind it.
+    """
+    t0 = time.perf_counter()
+    with _excel_lock, _file_lock(EXCEL_LOCK_PATH, blocking=wait) as locked:
+        held = time.perf_counter()
+        EXCEL_LOCK_WAIT_SECONDS.observe(held - t0)
+        if not locked:
+            return 0
+        try:
+            return _fold_journal()
+        finally:
+            EXCEL_LOCK_HOLD_SECONDS.observe(time.perf_counter() - held)
+
+
+def _fsync_path(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fold_journal() -> int:
     """
-    with _excel_lock:
-        if not os.path.exists(EXCEL_PATH):
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Leads"
-            ws.append(EXCEL_HEADERS)
-            wb.save(EXCEL_PATH)
-
-        wb = load_workbook(EXCEL_PATH)
+    Rotates the journal to .folding, writes leads.xlsx.tmp with those rows,
+    then renames .folding to .folded before swapping the workbook in. .folded
+    marks a batch that is already in the complete .tmp (or, once that is
+    swapped in, in leads.xlsx), so a run that died anywhere past that point
+    finishes the swap instead of folding the batch twice.
+    """
+    pending = LEADS_JOURNAL_PATH + ".folding"
+    folded = LEADS_JOURNAL_PATH + ".folded"
+    tmp = EXCEL_PATH + ".tmp"
+    if os.path.exists(folded):
+        if os.path.exists(tmp):
+            os.replace(tmp, EXCEL_PATH)
+        os.remove(folded)
+    if not os.path.exists(pending):
+        # A leftover .folding file means the last run died before its batch
+        # reached the workbook; retry it.
+        with _journal_lock, _file_lock(JOURNAL_LOCK_PATH):
+            if not os.path.exists(LEADS_JOURNAL_PATH) or os.path.getsize(LEADS_JOURNAL_PATH) == 0:
+                return 0
+            os.replace(LEADS_JOURNAL_PATH, pending)
+
+    rows = _read_journal(pending)
+    if os.path.exists(EXCEL_PATH):
+        with EXCEL_LOAD_SECONDS.time():
+            wb = load_workbook(EXCEL_PATH)
         ws = wb["Leads"] if "Leads" in wb.sheetnames else wb.active
+    else:
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Leads"
+        ws.append(EXCEL_HEADERS)
 
-        row = [lead.get(h, "") for h in EXCEL_HEADERS]
+    for row in rows:
         ws.append(row)
 
-        wb.save(EXCEL_PATH)
+    with EXCEL_SAVE_SECONDS.time():
+        wb.save(tmp)
+        _fsync_path(tmp)
+        os.replace(pending, folded)  # commit point: the batch now lives in tmp
+        os.replace(tmp, EXCEL_PATH)
+    os.remove(folded)
+    EXCEL_ROWS.set(ws.max_row - 1)
+    return len(rows)
+
+
+def _compactor_loop() -> None:
+    while not _compactor_stop.wait(EXCEL_COMPACT_INTERVAL_SECONDS):
+        try:
+            compact_leads_excel(wait=False)
+        except Exception:
+            # Journal is left in place; the next tick retries the same batch.
+            logger.exception("leads.xlsx compaction failed")
+
+
+def start_excel_compactor() -> None:
+    global _compactor_thread
+    if _compactor_thread is not None and _compactor_thread.is_alive():
+        return
+    if os.path.exists(EXCEL_PATH):
+        try:  # read-only mode only parses the sheet dimensions here
+            EXCEL_ROWS.set(load_workbook(EXCEL_PATH, read_only=True).active.max_row - 1)
+        except Exception:
+            logger.exception("couldn't read leads.xlsx row count")
+    _compactor_stop.clear()
+    _compactor_thread = threading.Thread(target=_compactor_loop, name="excel-compactor", daemon=True)
+    _compactor_thread.start()
+
+
+def stop_excel_compactor(flush: bool = True) -> None:
+    """
+    Stops the background compactor. With flush (a real shutdown) it waits for
+    a run in progress and folds whatever arrived since the last tick. Without
+    it (a worker recycled while others keep serving) it returns at once: the
+    journal is shared, the survivors' compactors fold it, and a fold cut off
+    mid-run is picked up by the next one (see _fold_journal).
+    """
+    global _compactor_thread
+    _compactor_stop.set()
+    if not flush:
+        return
+    if _compactor_thread is not None:
+        _compactor_thread.join()
+        _compactor_thread = None
+    compact_leads_excel()
 
 
 
@@ -79,8 +452,267 @@ LEARN_PREVIEW = {
 SERVICE_AREA = "Australia"
 DB_PATH = "leads.sqlite3"
 
+# -----------------------------
+# Cacheable responses (compression + validators)
+# Cacheable bodies are compressed once per content version and the gzip/brotli
+# variants are kept next to the original; requests only pick one by
+# Accept-Encoding. Each body also carries a content-hash ETag and a
+# Last-Modified stamp, so conditional requests get a 304 straight from the
+# cache. brotli is optional (pip install brotli); without it only gzip
+# variants are produced.
+# -----------------------------
+COMPRESS_MIN_BYTES = 512
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "image/svg+xml",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "application/manifest+json",
+)
+CACHE_HTML = "no-cache"  # always revalidate; a warm revisit costs one 304
+CACHE_GENERATED = "public, max-age=86400"
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "public, max-age=0, must-revalidate"
+
+
+def compress_variants(body: bytes) -> dict[str, bytes]:
+    variants = {"identity": body}
+    if len(body) < COMPRESS_MIN_BYTES:
+        return variants
+    variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    return variants
+
+
+def body_digest(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+class CachedBody:
+    """An encoded response body with its compressed variants and validators."""
+
+    __slots__ = ("variants", "digest", "last_modified")
+
+    def __init__(self, body: bytes, mtime: float | None = None):
+        self.variants = compress_variants(body)
+        self.digest = body_digest(body)
+        self.last_modified = formatdate(time.time() if mtime is None else mtime, usegmt=True)
+
+    def etag(self, encoding: str) -> str:
+        # Strong ETags must differ per representation, so tag the encoding on.
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token.strip())
+    return accepted
+
+
+def pick_encoding(accept_encoding: str | None, variants: dict[str, bytes]) -> str:
+    if not accept_encoding or len(variants) == 1:
+        return "identity"
+    accepted = _accepted_encodings(accept_encoding)
+    for enc in ("br", "gzip"):
+        if enc in variants and (enc in accepted or "*" in accepted):
+            return enc
+    return "identity"
+
+
+def _not_modified(request: Request, cached: CachedBody) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            tag = tag.strip().removeprefix("W/").strip('"')
+            if tag.split("-", 1)[0] == cached.digest:
+                return True
+        return False
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(cached.last_modified)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def encoded_response(
+    request: Request | None,
+    cached: CachedBody,
+    media_type: str,
+    cache_control: str = CACHE_HTML,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    enc = pick_encoding(request.headers.get("accept-encoding") if request else None, cached.variants)
+    out = dict(headers or {})
+    out["Cache-Control"] = cache_control
+    out["ETag"] = cached.etag(enc)
+    out["Last-Modified"] = cached.last_modified
+    if len(cached.variants) > 1:
+        out["Vary"] = "Accept-Encoding"
+    if request is not None and _not_modified(request, cached):
+        return Response(status_code=304, headers=out)
+    if enc != "identity":
+        out["Content-Encoding"] = enc
+    return Response(cached.variants[enc], media_type=media_type, headers=out)
+
+
+@lru_cache(maxsize=256)
+def _static_body(full_path: str, mtime_ns: int, size: int) -> CachedBody:
+    # (mtime, size) in the key means an edited file gets re-read on next hit.
+    with open(full_path, "rb") as f:
+        return CachedBody(f.read(), mtime=mtime_ns / 1e9)
+
+
+@lru_cache(maxsize=256)
+def _static_fingerprint(full_path: str, mtime_ns: int, size: int) -> str:
+    h = hashlib.blake2b(digest_size=5)
+    with open(full_path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _current_fingerprint(full_path: str) -> str | None:
+    try:
+        st = os.stat(full_path)
+    except OSError:
+        return None
+    return _static_fingerprint(full_path, st.st_mtime_ns, st.st_size)
+
+
+def static_url(url: str) -> str:
+    """
+    /static/x.png -> /static/x.png?v=<content hash>. The mount serves
+    fingerprinted URLs as immutable, so browsers never revalidate them.
+    """
+    if not url.startswith("/static/"):
+        return url
+    v = _current_fingerprint(os.path.join("static", url[len("/static/"):]))
+    return f"{url}?v={v}" if v else url
+
+
+# -----------------------------
+# Build artifacts: responsive images + precompiled Tailwind CSS
+# `python manage.py build-assets` writes width-stepped AVIF/WebP copies of the
+# static PNGs to static/build/ plus a manifest; responsive_img() turns a manifest
+# entry into <picture>/srcset markup. Without a manifest it falls back to <img>.
+# `python manage.py build-css` compiles the Tailwind classes the templates use
+# into one purged, minified stylesheet that replaces the CDN JIT script.
+# -----------------------------
+ASSET_BUILD_DIR = "build"
+ASSET_MANIFEST_PATH = os.path.join("static", ASSET_BUILD_DIR, "manifest.json")
+TAILWIND_CSS_PATH = os.path.join("static", ASSET_BUILD_DIR, "tailwind.css")
+TAILWIND_CDN = "https://cdn.tailwindcss.com"
+BUILD_ARTIFACTS = [ASSET_MANIFEST_PATH, TAILWIND_CSS_PATH]  # + vendored JS, see VENDOR_JS
+mimetypes.add_type("image/avif", ".avif")  # missing from older system mime tables
+mimetypes.add_type("image/webp", ".webp")
+
+
+@lru_cache(maxsize=4)
+def _load_asset_manifest(mtime_ns: int) -> dict:
+    with open(ASSET_MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def asset_manifest() -> dict:
+    try:
+        st = os.stat(ASSET_MANIFEST_PATH)
+    except OSError:
+        return {}
+    return _load_asset_manifest(st.st_mtime_ns)
+
+
+def _build_stamp() -> tuple:
+    # mtimes of generated files the templates read; a rebuild changes the stamp.
+    stamp = []
+    for path in BUILD_ARTIFACTS + [path for _, path, _, _ in VENDOR_JS.values()]:
+        try:
+            stamp.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            stamp.append(0)
+    return tuple(stamp)
+
+
+def tailwind_tag() -> str:
+    """
+    The precompiled stylesheet from `python manage.py build-css` when it exists,
+    otherwise the runtime Tailwind CDN compiler.
+    """
+    if os.path.exists(TAILWIND_CSS_PATH):
+        return f'<link rel="stylesheet" href="{static_url("/" + TAILWIND_CSS_PATH.replace(os.sep, "/"))}"/>'
+    return f'<script src="{TAILWIND_CDN}"></script>'
+
+
+def responsive_img(src: str, alt: str, sizes: str, cls: str = "", lazy: bool = True) -> str:
+    """
+    <img> for a /static PNG, upgraded to <picture> with AVIF/WebP srcsets when
+    the asset build has produced variants. `sizes` is the rendered width hint.
+    """
+    loading = ' loading="lazy" decoding="async"' if lazy else ""
+    cls_attr = f' class="{cls}"' if cls else ""
+    entry = asset_manifest().get(src)
+    if not entry:
+        return f'<img src="{static_url(src)}" alt="{alt}"{cls_attr}{loading}/>'
+    sources = "".join(
+        f'<source type="image/{fmt}" sizes="{sizes}" srcset="'
+        + ", ".join(f'{static_url(v["url"])} {v["w"]}w' for v in variants)
+        + '"/>'
+        for fmt, variants in entry["variants"].items()
+        if variants
+    )
+    return (
+        f'<picture>{sources}<img src="{static_url(src)}" alt="{alt}"{cls_attr}'
+        f' width="{entry["width"]}" height="{entry["height"]}"{loading}/></picture>'
+    )
+
+
+class CompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles with cache headers and compression. URLs whose ?v= matches
+    the file's content hash are immutable; anything else revalidates. Text-like assets (css/js/svg/json...)
+    go out from cached gzip/brotli variants. Images such as PNG/WebP/AVIF are
+    already compressed and go out untouched.
+    """
+
+    async def get_response(self, path: str, scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code not in (200, 304):
+            return response
+        request = Request(scope)
+        # Only the current content hash is immutable: a stale or made-up ?v=
+        # must not pin whatever this file holds today into caches for a year.
+        v = request.query_params.get("v")
+        current = v and await anyio.to_thread.run_sync(_current_fingerprint, os.path.join(self.directory, path))
+        cache_control = CACHE_IMMUTABLE if v and v == current else CACHE_REVALIDATE
+        response.headers["Cache-Control"] = cache_control
+        if not isinstance(response, FileResponse) or response.stat_result is None:
+            return response
+        media_type = response.media_type or ""
+        if not media_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        st = response.stat_result
+        cached = await anyio.to_thread.run_sync(_static_body, str(response.path), st.st_mtime_ns, st.st_size)
+        if len(cached.variants) == 1:
+            return response
+        return encoded_response(request, cached, media_type, cache_control=cache_control)
+
+
 app = FastAPI(title=APP_NAME)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", CompressedStaticFiles(directory="static"), name="static")
 
 # -----------------------------
 # Admin auth (simple, no external deps)
@@ -118,30 +750,496 @@ def _make_session(username: str) -> str:
     sig = _sign(payload)
     return f"{token}.{sig}"
 
-def _verify_session(cookie_val: str | None) -> bool:
-    if not cookie_val:
-        return False
+def _signed_subject(value: str | None) -> str | None:
+    """The subject of a valid, unexpired "<payload>.<sig>" token, else None."""
+    if not value:
+        return None
     try:
-        token, sig = cookie_val.split(".", 1)
+        token, sig = value.split(".", 1)
         payload = _b64url_decode(token)
         expected = _sign(payload)
         if not hmac.compare_digest(sig, expected):
-            return False
+            return None
         parts = payload.decode("utf-8").split("|", 1)
         if len(parts) != 2:
-            return False
-        username, exp_s = parts[0], parts[1]
-        if username != ADMIN_USER:
-            return False
+            return None
+        subject, exp_s = parts[0], parts[1]
         if int(exp_s) < int(time.time()):
-            return False
-        return True
+            return None
+        return subject
     except Exception:
-        return False
+        return None
+
+
+def _session_user(cookie_val: str | None) -> str | None:
+    """The admin a valid, unexpired session cookie belongs to, else None."""
+    username = _signed_subject(cookie_val)
+    return username if username == ADMIN_USER else None
+
+
+EXPORT_TOKEN_PREFIX = "export:"
+
+
+def _make_export_token(client: str, ttl_seconds: int) -> str:
+    """
+    Bearer token for /api/leads/export, signed like a session but for a named
+    client ("crm-sync") and never valid as an admin cookie. Rotating
+    ADMIN_SECRET_KEY revokes every token.
+    """
+    exp = int(time.time()) + ttl_seconds
+    payload = f"{EXPORT_TOKEN_PREFIX}{client}|{exp}".encode("utf-8")
+    return f"{_b64url_encode(payload)}.{_sign(payload)}"
+
+
+def _export_client(token: str | None) -> str | None:
+    subject = _signed_subject(token)
+    if subject is None or not subject.startswith(EXPORT_TOKEN_PREFIX):
+        return None
+    return subject[len(EXPORT_TOKEN_PREFIX):]
+
+
+def _verify_session(cookie_val: str | None) -> bool:
+    return _session_user(cookie_val) is not None
+
+
+# -----------------------------
+# SQLite connection pool
+# Every DB touchpoint borrows a connection from here instead of connecting per call.
+# Connections run in WAL mode so readers never block the writer, and each one keeps
+# sqlite3's statement cache warm for the fixed SQL strings below.
+# Configure via env vars:
+#   DB_POOL_SIZE (default: 8) idle connections kept around
+#   DB_BUSY_TIMEOUT_MS (default: 5000)
+#   DB_SYNCHRONOUS (default: FULL, so a commit means the lead survives power loss;
+#     cheap because inserts are group-committed, see below)
+# -----------------------------
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "FULL").upper()
+_db_pool: queue.LifoQueue = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+INSERT_LEAD_SQL = """
+    INSERT INTO leads (created_at, name, phone, email, suburb, service, message, page)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _db_connect() -> sqlite3.Connection:
+    with DB_CONNECT_SECONDS.time():
+        con = sqlite3.connect(
+            DB_PATH,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,  # pooled: may be returned on a different thread
+            cached_statements=128,
+        )
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS}")
+        con.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+        con.execute("PRAGMA temp_store=MEMORY")
+    return con
+
+
+@contextmanager
+def db_connection():
+    """
+    Borrows a pooled connection for the duration of the block.
+    Writes still need an explicit commit (or `with con:`); anything left
+    uncommitted is rolled back before the connection goes back in the pool.
+    """
+    try:
+        con = _db_pool.get_nowait()
+    except queue.Empty:
+        con = _db_connect()
+    try:
+        yield con
+    finally:
+        if con.in_transaction:
+            con.rollback()
+        try:
+            _db_pool.put_nowait(con)
+        except queue.Full:
+            con.close()
+
+
+def close_db_pool() -> None:
+    while True:
+        try:
+            _db_pool.get_nowait().close()
+        except queue.Empty:
+            return
+
+
+# -----------------------------
+# Group-commit lead writer
+# Quote submissions hand their row to one writer thread, which commits everything
+# that arrives within LEAD_BATCH_WINDOW_MS (or LEAD_BATCH_MAX rows) in a single
+# transaction. Each submitter gets a Future that resolves to the new lead id
+# only once that transaction has committed.
+# Configure via env vars:
+#   LEAD_BATCH_WINDOW_MS (default: 2)
+#   LEAD_BATCH_MAX (default: 200)
+#   LEAD_QUEUE_MAX (default: 2000) rows waiting before /api/quote answers 503
+#   INGEST_WORKERS (default: 2) threads for the journal append, kept apart from
+#     the threadpool that serves page GETs
+# -----------------------------
+LEAD_BATCH_WINDOW_MS = float(os.getenv("LEAD_BATCH_WINDOW_MS", "2"))
+LEAD_BATCH_MAX = int(os.getenv("LEAD_BATCH_MAX", "200"))
+LEAD_QUEUE_MAX = int(os.getenv("LEAD_QUEUE_MAX", "2000"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+INGEST_RETRY_AFTER_SECONDS = 5
+_lead_queue: queue.Queue = queue.Queue(maxsize=LEAD_QUEUE_MAX)
+_ingest_executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="ingest")
+_lead_writer_lock = threading.Lock()
+_lead_writer_thread: threading.Thread | None = None
+
+
+def _insert_leads(batch: list[tuple[tuple, Future]]) -> list[int]:
+    with db_connection() as con:
+        with DB_INSERT_SECONDS.time():
+            ids = [con.execute(INSERT_LEAD_SQL, params).lastrowid for params, _ in batch]
+        with DB_COMMIT_SECONDS.time():
+            con.commit()  # db_connection() rolls back if anything above raised
+    return ids
+
+
+def _commit_lead_batch(batch: list[tuple[tuple, Future]]) -> None:
+    # A cancelled Future's submitter has stopped waiting, so its row is
+    # dropped; the rest are marked running and can no longer be cancelled.
+    batch = [(params, fut) for params, fut in batch if fut.set_running_or_notify_cancel()]
+    if not batch:
+        return
+    LEAD_BATCH_ROWS.observe(len(batch))
+    try:
+        ids = _insert_leads(batch)
+    except Exception as e:
+        if len(batch) == 1:
+            batch[0][1].set_exception(e)
+            return
+        # One bad row mustn't fail its neighbours: retry each on its own.
+        for item in batch:
+            try:
+                (lead_id,) = _insert_leads([item])
+            except Exception as row_error:
+                item[1].set_exception(row_error)
+            else:
+                item[1].set_result(lead_id)
+        return
+    for (_, fut), lead_id in zip(batch, ids):
+        fut.set_result(lead_id)
+
+
+def _lead_writer_loop() -> None:
+    window = LEAD_BATCH_WINDOW_MS / 1000
+    stopping = False
+    while not stopping:
+        item = _lead_queue.get()
+        if item is None:
+            return
+        batch = [item]
+        deadline = time.monotonic() + window
+        while len(batch) < LEAD_BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            try:
+                item = _lead_queue.get(timeout=remaining) if remaining > 0 else _lead_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+        try:
+            _commit_lead_batch(batch)
+        except Exception as e:
+            # Keep the writer alive; nobody in this batch may be left waiting.
+            logger.exception("lead batch commit failed")
+            for _, fut in batch:
+                if not fut.done():
+                    try:
+                        fut.set_exception(e)
+                    except InvalidStateError:
+                        pass
+
+
+def start_lead_writer() -> None:
+    global _lead_writer_thread
+    with _lead_writer_lock:
+        if _lead_writer_thread is not None and _lead_writer_thread.is_alive():
+            return
+        _lead_writer_thread = threading.Thread(target=_lead_writer_loop, name="lead-writer", daemon=True)
+        _lead_writer_thread.start()
+
+
+def stop_lead_writer() -> None:
+    global _lead_writer_thread
+    with _lead_writer_lock:
+        if _lead_writer_thread is None:
+            return
+        _lead_queue.put(None)  # drains everything queued ahead of it first (blocks if full)
+        _lead_writer_thread.join()
+        _lead_writer_thread = None
+
+
+def submit_lead(params: tuple) -> Future:
+    """
+    Queues one INSERT_LEAD_SQL row for the next group commit.
+    The returned Future resolves to the lead id once the row is durable.
+    Raises queue.Full when LEAD_QUEUE_MAX rows are already waiting.
+    """
+    start_lead_writer()
+    fut: Future = Future()
+    _lead_queue.put_nowait((params, fut))
+    return fut
+
+
+# -----------------------------
+# Page views (for lead conversion per page on /admin/dashboard)
+# Counted in memory per worker and added to the page_views rollup every
+# PAGE_VIEW_FLUSH_SECONDS, so a page view never waits on SQLite.
+# -----------------------------
+PAGE_VIEW_FLUSH_SECONDS = float(os.getenv("PAGE_VIEW_FLUSH_SECONDS", "30"))
+ROLLUP_PAGES: set[str] = set()  # public HTML routes; filled in once every route is registered
+_page_views: dict[tuple[int, str], int] = {}  # (UTC day number, page) -> views
+_page_views_lock = threading.Lock()
+_page_view_stop = threading.Event()
+_page_view_thread: threading.Thread | None = None
+
+
+def rollup_page(page: str) -> str:
+    """A submitted/visited path as a rollup value: a known public page, else 'other'."""
+    return page if page in ROLLUP_PAGES else "other"
+
+
+def rollup_buckets(day: date) -> dict[str, str]:
+    """The day/week/month bucket keys a UTC date falls in (see ROLLUP_PERIODS)."""
+    return {
+        "day": day.isoformat(),
+        "week": (day - timedelta(days=day.weekday())).isoformat(),
+        "month": day.replace(day=1).isoformat(),
+    }
+
+
+def count_page_view(page: str) -> None:
+    key = (int(time.time() // 86400), page)
+    with _page_views_lock:
+        _page_views[key] = _page_views.get(key, 0) + 1
+
+
+def flush_page_views() -> None:
+    global _page_views
+    with _page_views_lock:
+        pending, _page_views = _page_views, {}
+    if not pending:
+        return
+    epoch = date(1970, 1, 1)
+    rows = [
+        (period, bucket, page, views)
+        for (day, page), views in pending.items()
+        for period, bucket in rollup_buckets(epoch + timedelta(days=day)).items()
+    ]
+    try:
+        with db_connection() as con:
+            con.executemany(
+                "INSERT INTO page_views (period, bucket, page, views) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT DO UPDATE SET views = views + excluded.views",
+                rows,
+            )
+            con.commit()
+    except sqlite3.Error:
+        # Put the counts back for the next tick rather than lose them.
+        with _page_views_lock:
+            for key, views in pending.items():
+                _page_views[key] = _page_views.get(key, 0) + views
+        raise
+
+
+def _page_view_loop() -> None:
+    while not _page_view_stop.wait(PAGE_VIEW_FLUSH_SECONDS):
+        try:
+            flush_page_views()
+        except Exception:
+            logger.exception("page view flush failed")
+
+
+def start_page_view_flusher() -> None:
+    global _page_view_thread
+    if _page_view_thread is not None and _page_view_thread.is_alive():
+        return
+    _page_view_stop.clear()
+    _page_view_thread = threading.Thread(target=_page_view_loop, name="page-views", daemon=True)
+    _page_view_thread.start()
+
+
+def stop_page_view_flusher() -> None:
+    global _page_view_thread
+    _page_view_stop.set()
+    if _page_view_thread is not None:
+        _page_view_thread.join()
+        _page_view_thread = None
+    flush_page_views()
+
+
+# SQL for a lead's phone as FTS tokens: the bare digits, and for +61 numbers
+# the local 0-prefixed form too, so "0412 3" and "+61 412 3" both match.
+_FTS_PHONE_DIGITS = "replace(replace(replace(replace(replace(replace({row}.phone, ' ', ''), '-', ''), '(', ''), ')', ''), '+', ''), '.', '')"
+_FTS_PHONE = (
+    f"{_FTS_PHONE_DIGITS} || CASE WHEN {_FTS_PHONE_DIGITS} LIKE '61%' "
+    f"THEN ' 0' || substr({_FTS_PHONE_DIGITS}, 3) ELSE '' END"
+)
+
+# Lead analytics rollups: lead counts per (period, dimension, bucket, value),
+# e.g. ('week', 'suburb', '2026-03-02', 'Bondi'), kept current by triggers on
+# leads so the dashboard never scans leads itself. Buckets are UTC dates; a
+# week starts on Monday.
+ROLLUP_PERIODS = {
+    "day": "substr({row}.created_at, 1, 10)",
+    # From the same 10-character date as "day": date() on the full timestamp
+    # rounds to milliseconds, pushing Sunday 23:59:59.9995+ into next week.
+    "week": "date(substr({row}.created_at, 1, 10), 'weekday 0', '-6 days')",
+    "month": "substr({row}.created_at, 1, 7) || '-01'",
+}
+ROLLUP_DIMENSIONS = {
+    "service": "{row}.service",
+    "suburb": "{row}.suburb",
+    "page": "coalesce({row}.page, '')",
+}
+
+
+def _rollup_upsert(row: str, delta: int) -> str:
+    values = ", ".join(
+        f"('{period}', '{dimension}', {bucket.format(row=row)}, {value.format(row=row)}, {delta})"
+        for period, bucket in ROLLUP_PERIODS.items()
+        for dimension, value in ROLLUP_DIMENSIONS.items()
+    )
+    return (
+        f"INSERT INTO lead_rollups (period, dimension, bucket, value, leads) VALUES {values} "
+        "ON CONFLICT DO UPDATE SET leads = leads + excluded.leads;"
+    )
+
+
+# Keep lead_rollups current as leads are inserted, edited and deleted.
+ROLLUP_TRIGGERS = {
+    "lead_rollups_insert": ("AFTER INSERT ON leads", [_rollup_upsert("new", 1)]),
+    "lead_rollups_update": (
+        "AFTER UPDATE OF created_at, service, suburb, page ON leads",
+        [_rollup_upsert("old", -1), _rollup_upsert("new", 1)],
+    ),
+    "lead_rollups_delete": ("AFTER DELETE ON leads", [_rollup_upsert("old", -1)]),
+}
+ROLLUP_TRIGGERS_SQL = [
+    f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN\n  " + "\n  ".join(body) + "\nEND"
+    for name, (event, body) in ROLLUP_TRIGGERS.items()
+]
+
+# Recomputes lead_rollups from leads (migrations 3 and 5, manage.py rebuild-rollups).
+ROLLUP_REBUILD_SQL = [
+    "DELETE FROM lead_rollups",
+    "INSERT INTO lead_rollups (period, dimension, bucket, value, leads) "
+    "SELECT period, dimension, bucket, min(value), count(*) FROM ("
+    + " UNION ALL ".join(
+        f"SELECT '{period}' AS period, '{dimension}' AS dimension, {bucket.format(row='leads')} AS bucket, "
+        f"{value.format(row='leads')} AS value FROM leads"
+        for period, bucket in ROLLUP_PERIODS.items()
+        for dimension, value in ROLLUP_DIMENSIONS.items()
+    )
+    + ") GROUP BY period, dimension, bucket, value COLLATE NOCASE",
+]
+
+# Schema changes on top of the original leads table, applied in order by
+# init_db and recorded in PRAGMA user_version. Each step runs in one write
+# transaction, so it lands exactly once even with several workers starting.
+SCHEMA_MIGRATIONS: list[list[str]] = [
+    # 1: keyset pagination for /admin/leads, newest first, optionally narrowed
+    #    to one service or suburb; each index ends in (created_at, id). They are
+    #    deliberately not covering: a page reads at most limit+1 rows by rowid
+    #    after the seek, and covering the selected columns would copy every
+    #    lead's message into three indexes.
+    [
+        "CREATE INDEX IF NOT EXISTS leads_created_idx ON leads (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS leads_service_created_idx ON leads (service, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS leads_suburb_created_idx ON leads (suburb COLLATE NOCASE, created_at, id)",
+    ],
+    # 2: full-text search for /admin/search. leads_fts keeps its own copy of
+    #    the text (rowid = leads.id) so the phone column can hold digits only,
+    #    plus the 0-prefixed local form of +61 numbers, for prefix matching.
+    [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5(
+          name, phone, email, suburb, message,
+          tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4'
+        )
+        """,
+        "INSERT INTO leads_fts (leads_fts, rank) VALUES ('rank', 'bm25(10.0, 8.0, 4.0, 2.0, 1.0)')",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS leads_fts_insert AFTER INSERT ON leads BEGIN
+          INSERT INTO leads_fts (rowid, name, phone, email, suburb, message)
+          VALUES (new.id, new.name, {_FTS_PHONE.format(row="new")}, new.email, new.suburb, new.message);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS leads_fts_update AFTER UPDATE ON leads BEGIN
+          DELETE FROM leads_fts WHERE rowid = old.id;
+          INSERT INTO leads_fts (rowid, name, phone, email, suburb, message)
+          VALUES (new.id, new.name, {_FTS_PHONE.format(row="new")}, new.email, new.suburb, new.message);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS leads_fts_delete AFTER DELETE ON leads BEGIN
+          DELETE FROM leads_fts WHERE rowid = old.id;
+        END
+        """,
+        f"""
+        INSERT INTO leads_fts (rowid, name, phone, email, suburb, message)
+        SELECT id, name, {_FTS_PHONE.format(row="leads")}, email, suburb, message FROM leads
+        """,
+    ],
+    # 3: analytics rollups for /admin/dashboard, plus page views (flushed from
+    #    memory by each worker) for lead conversion per page.
+    [
+        """
+        CREATE TABLE IF NOT EXISTS lead_rollups (
+          period TEXT NOT NULL,
+          dimension TEXT NOT NULL,
+          bucket TEXT NOT NULL,
+          value TEXT NOT NULL COLLATE NOCASE,
+          leads INTEGER NOT NULL,
+          PRIMARY KEY (period, dimension, bucket, value)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS page_views (
+          period TEXT NOT NULL,
+          bucket TEXT NOT NULL,
+          page TEXT NOT NULL,
+          views INTEGER NOT NULL,
+          PRIMARY KEY (period, bucket, page)
+        ) WITHOUT ROWID
+        """,
+        *ROLLUP_TRIGGERS_SQL,
+        *ROLLUP_REBUILD_SQL,
+    ],
+    # 4: where each admin's last /admin/leads/delta download stopped.
+    [
+        """
+        CREATE TABLE IF NOT EXISTS export_cursors (
+          admin TEXT PRIMARY KEY,
+          last_id INTEGER NOT NULL,
+          updated_at TEXT NOT NULL
+        )
+        """,
+    ],
+    # 5: week buckets from the date part of created_at (see ROLLUP_PERIODS);
+    #    the triggers carry the bucket SQL, so they are recreated, and rollups
+    #    written with the old expression are recounted.
+    [
+        *(f"DROP TRIGGER IF EXISTS {name}" for name in ROLLUP_TRIGGERS),
+        *ROLLUP_TRIGGERS_SQL,
+        *ROLLUP_REBUILD_SQL,
+    ],
+]
 
 
 def init_db() -> None:
-    with sqlite3.connect(DB_PATH) as con:
+    with db_connection() as con:
         con.execute(
             """
             CREATE TABLE IF NOT EXISTS leads (
@@ -158,15 +1256,55 @@ def init_db() -> None:
             """
         )
         con.commit()
+        # One migration per write transaction, re-reading the version under the
+        # lock, so workers starting together apply each step exactly once.
+        while True:
+            con.execute("BEGIN IMMEDIATE")
+            version = con.execute("PRAGMA user_version").fetchone()[0]
+            if version >= len(SCHEMA_MIGRATIONS):
+                con.rollback()
+                break
+            for sql in SCHEMA_MIGRATIONS[version]:
+                con.execute(sql)
+            con.execute(f"PRAGMA user_version = {version + 1}")
+            con.commit()
+            logger.info("leads schema migrated to version %d", version + 1)
 
 
 @app.on_event("startup")
 def _startup() -> None:
     init_db()
+    start_lead_writer()
+    start_excel_compactor()
+    start_page_view_flusher()
+    warm_render_caches()
     # Basic safety: require secrets in production
     if os.getenv("ENV", "").lower() == "production":
         if not ADMIN_PASS or not ADMIN_SECRET_KEY:
             raise RuntimeError("Missing ADMIN_PASS or ADMIN_SECRET_KEY env vars in production")
+        if not METRICS_TOKEN:
+            raise RuntimeError("Missing METRICS_TOKEN env var in production (/metrics would be public)")
+
+
+_recycling = False
+
+
+def mark_recycling() -> None:
+    """
+    Called by serve.py when this worker is exiting for --max-requests rather
+    than a shutdown, so it skips the final blocking leads.xlsx compaction and
+    the parent can respawn it straight away.
+    """
+    global _recycling
+    _recycling = True
+
+
+@app.on_event("shutdown")
+def _shutdown() -> None:
+    stop_lead_writer()
+    stop_excel_compactor(flush=not _recycling)
+    stop_page_view_flusher()
+    close_db_pool()
 
 
 # -----------------------------
@@ -193,10 +1331,13 @@ def svg_brandmark() -> str:
 </svg>"""
 
 
+ART_PALETTE = ["#7dd3fc", "#c4b5fd", "#34d399", "#fb7185", "#fbbf24", "#60a5fa"]
+
+
 def svg_art(seed: int, label: str) -> str:
     # “photo-like” abstract finish boards (generated)
     # (not icons; feels like modern portfolio thumbnails)
-    a = ["#7dd3fc", "#c4b5fd", "#34d399", "#fb7185", "#fbbf24", "#60a5fa"]
+    a = ART_PALETTE
     c1 = a[(seed * 3) % len(a)]
     c2 = a[(seed * 5 + 1) % len(a)]
     c3 = a[(seed * 7 + 2) % len(a)]
@@ -247,9 +1388,14 @@ def svg_art(seed: int, label: str) -> str:
 </svg>"""
 
 
+@lru_cache(maxsize=None)
+def _brandmark_body() -> CachedBody:
+    return CachedBody(svg_brandmark().encode("utf-8"))
+
+
 @app.get("/img/brand.svg")
-def img_brand():
-    return Response(svg_brandmark(), media_type="image/svg+xml")
+def img_brand(request: Request):
+    return encoded_response(request, _brandmark_body(), "image/svg+xml", CACHE_GENERATED)
 
 def svg_figma_bg() -> str:
     # Matches the Figma hero panel: soft top-left highlight + light blue wash + subtle vignette
@@ -285,22 +1431,48 @@ def svg_figma_bg() -> str:
 </svg>"""
 
 
+@lru_cache(maxsize=None)
+def _figma_bg_body() -> CachedBody:
+    return CachedBody(svg_figma_bg().encode("utf-8"))
+
+
 @app.get("/img/figma-bg.svg")
-def img_figma_bg():
-    return Response(svg_figma_bg(), media_type="image/svg+xml")
+def img_figma_bg(request: Request):
+    return encoded_response(request, _figma_bg_body(), "image/svg+xml", CACHE_GENERATED)
+
+
+ART_LABELS = [
+    "Interior Finish — Clean Edges",
+    "Exterior Refresh — Weather Ready",
+    "Commercial — Durable Coats",
+    "Surface Prep — Smooth Base",
+    "Premium Finish — Even Coverage",
+    "Detail Work — Trims & Doors",
+    "Retail Space — After Hours",
+    "Apartment Repaint — Low Odour",
+]
+# svg_art only sees the seed through `seed % len(ART_PALETTE)` and the label
+# through `seed % len(ART_LABELS)`, so every seed renders the same as seed
+# modulo the lcm of the two.
+ART_VARIANTS = math.lcm(len(ART_LABELS), len(ART_PALETTE))
+
+
+@lru_cache(maxsize=ART_VARIANTS)
+def _art_body(seed: int) -> CachedBody:
+    return CachedBody(svg_art(seed, ART_LABELS[seed % len(ART_LABELS)]).encode("utf-8"))
+
+
 @app.get("/img/art/{seed}.svg")
-def img_art(seed: int):
-    label = [
-        "Interior Finish — Clean Edges",
-        "Exterior Refresh — Weather Ready",
-        "Commercial — Durable Coats",
-        "Surface Prep — Smooth Base",
-        "Premium Finish — Even Coverage",
-        "Detail Work — Trims & Doors",
-        "Retail Space — After Hours",
-        "Apartment Repaint — Low Odour",
-    ][seed % 8]
-    return Response(svg_art(seed, label), media_type="image/svg+xml")
+def img_art(request: Request, seed: int):
+    canonical = seed % ART_VARIANTS
+    if canonical != seed:
+        # Collapse crawler/CDN traffic for arbitrary seeds onto the few real objects.
+        return RedirectResponse(
+            url=f"/img/art/{canonical}.svg",
+            status_code=301,
+            headers={"Cache-Control": CACHE_IMMUTABLE},
+        )
+    return encoded_response(request, _art_body(canonical), "image/svg+xml", CACHE_GENERATED)
 
 # -----------------------------
 # Admin pages (login + protected download)
@@ -390,6 +1562,26 @@ def admin_home(request: Request):
         <div class="text-sm font-extrabold">Download leads</div>
         <p class="mt-2 text-sm text-slate-600">Only accessible after login.</p>
         <a class="mt-4 inline-flex btn btn-primary" href="/admin/leads.xlsx">Download leads.xlsx</a>
+        <a class="mt-4 ml-2 inline-flex btn btn-ghost" href="/admin/leads">Browse leads</a>
+        <a class="mt-4 ml-2 inline-flex btn btn-ghost" href="/admin/search">Search leads</a>
+        <a class="mt-4 ml-2 inline-flex btn btn-ghost" href="/admin/dashboard">Dashboard</a>
+        <div class="mt-3 text-sm text-slate-600">New since your last download:
+          <a class="underline" href="/admin/leads/delta?format=xlsx">xlsx</a> ·
+          <a class="underline" href="/admin/leads/delta?format=csv">csv</a> ·
+          <a class="underline" href="/admin/leads/delta?format=ndjson">ndjson</a>
+        </div>
+      </div>
+
+      <div class="mt-6 card2 p-6">
+        <div class="text-sm font-extrabold">Export from database</div>
+        <p class="mt-2 text-sm text-slate-600">Built live from the leads database. Leave a field blank to skip that filter.</p>
+        <form class="mt-4 grid gap-3 md:grid-cols-3" method="get" action="/admin/leads.xlsx">
+          <input type="hidden" name="source" value="db"/>
+          <input name="since" type="date" class="field" aria-label="Since"/>
+          <input name="until" type="date" class="field" aria-label="Until"/>
+          <input name="service" class="field" placeholder="Service (exact)"/>
+          <button class="btn btn-primary md:col-span-3" type="submit">Export leads.xlsx</button>
+        </form>
       </div>
     </div>
   </div>
@@ -403,92 +1595,742 @@ def admin_logout():
     resp.delete_cookie(key=ADMIN_COOKIE_NAME, path="/")
     return resp
 
+LEAD_EXPORT_COLUMNS = [
+    "id",
+    "created_at",
+    "name",
+    "phone",
+    "email",
+    "suburb",
+    "service",
+    "message",
+    "page",
+]
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _parse_day_or_ts(value: str, end: bool = False) -> str:
+    """
+    Turns a since/until query value into a bound comparable with created_at.
+    A bare date (YYYY-MM-DD) as an upper bound covers that whole day.
+    """
+    value = value.strip()
+    dt = datetime.fromisoformat(value)
+    if len(value) == 10 and end:
+        dt += timedelta(days=1)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+def _lead_filters(since: str = "", until: str = "", service: str = "", suburb: str = "") -> tuple[str, list]:
+    clauses: list[str] = []
+    params: list = []
+    try:
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(_parse_day_or_ts(since))
+        if until:
+            clauses.append("created_at < ?")
+            params.append(_parse_day_or_ts(until, end=True))
+    except ValueError:
+        raise ValueError("since/until must be ISO dates, e.g. 2026-01-31")
+    if service:
+        clauses.append("service = ?")
+        params.append(service.strip())
+    if suburb:
+        clauses.append("suburb = ? COLLATE NOCASE")
+        params.append(suburb.strip())
+    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    return where, params
+
+
+def _lead_rows(where: str = "", params: list | tuple = (), con: sqlite3.Connection | None = None):
+    """Matching leads in id order, stepped one row at a time off the cursor."""
+    if con is None:
+        with db_connection() as con:
+            yield from _lead_rows(where, params, con)
+        return
+    yield from con.execute(f"SELECT {', '.join(LEAD_EXPORT_COLUMNS)} FROM leads{where} ORDER BY id", params)
+
+
+def stream_leads_xlsx(where: str = "", params: list | tuple = (), con: sqlite3.Connection | None = None):
+    """
+    Builds leads.xlsx straight from the leads table and yields it in chunks.
+    The write-only workbook spools rows to disk as they arrive, so memory
+    stays flat regardless of how many leads match.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Leads")
+    ws.append(LEAD_EXPORT_COLUMNS)
+    for row in _lead_rows(where, params, con):
+        ws.append([xlsx_cell(v) for v in row])
+
+    with tempfile.TemporaryFile() as f:
+        wb.save(f)
+        f.seek(0)
+        while chunk := f.read(EXPORT_CHUNK_SIZE):
+            yield chunk
+
+
+def _chunked(pieces):
+    """Joins small str pieces into ~EXPORT_CHUNK_SIZE byte chunks for a StreamingResponse."""
+    buf, size = [], 0
+    for piece in pieces:
+        buf.append(piece)
+        size += len(piece)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(buf).encode("utf-8")
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf).encode("utf-8")
+
+
+def _csv_line(row) -> str:
+    out = io.StringIO()
+    csv.writer(out).writerow(row)
+    return out.getvalue()
+
+
+def stream_leads_csv(where: str = "", params: list | tuple = (), con: sqlite3.Connection | None = None):
+    """Leads as CSV (header row first), streamed from the cursor."""
+    yield from _chunked(_csv_line(row) for row in itertools.chain([LEAD_EXPORT_COLUMNS], _lead_rows(where, params, con)))
+
+
+def stream_leads_ndjson(where: str = "", params: list | tuple = (), con: sqlite3.Connection | None = None):
+    """Leads as one JSON object per line, streamed from the cursor."""
+    yield from _chunked(
+        json.dumps(dict(zip(LEAD_EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n"
+        for row in _lead_rows(where, params, con)
+    )
+
+
+# format -> (streamer, media type)
+LEAD_EXPORT_FORMATS = {
+    "xlsx": (stream_leads_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": (stream_leads_csv, "text/csv; charset=utf-8"),
+    "ndjson": (stream_leads_ndjson, "application/x-ndjson"),
+}
+
+
 @app.get("/admin/leads.xlsx")
-def admin_download_leads(request: Request):
+def admin_download_leads(
+    request: Request,
+    source: str = "",
+    since: str = "",
+    until: str = "",
+    service: str = "",
+    suburb: str = "",
+):
     if not _verify_session(request.cookies.get(ADMIN_COOKIE_NAME)):
         return RedirectResponse(url="/admin/login", status_code=303)
 
-    path = EXCEL_PATH
-    if not os.path.exists(path):
+    # Filters only make sense against SQLite, so any filter implies source=db.
+    if source == "db" or since or until or service or suburb:
+        try:
+            where, params = _lead_filters(since, until, service, suburb)
+        except ValueError as e:
+            return Response(str(e), status_code=400)
+        return StreamingResponse(
+            stream_leads_xlsx(where, params),
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            headers={"Content-Disposition": 'attachment; filename="leads.xlsx"'},
+        )
+
+    # Serves the last compacted workbook; the background compactor folds new
+    # leads in every EXCEL_COMPACT_INTERVAL_SECONDS (source=db is up to the second).
+    try:
+        # Holding the fd pins this version of the file even if the compactor
+        # swaps in a new one mid-download.
+        f = open(EXCEL_PATH, "rb")
+    except FileNotFoundError:
         return Response("leads.xlsx not found yet", status_code=404)
 
-    return FileResponse(
-        path,
-        filename="leads.xlsx",
+    size = os.fstat(f.fileno()).st_size
+
+    def _chunks():
+        with f:
+            while chunk := f.read(EXPORT_CHUNK_SIZE):
+                yield chunk
+
+    return StreamingResponse(
+        _chunks(),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "Content-Disposition": 'attachment; filename="leads.xlsx"',
+            "Content-Length": str(size),
+        },
     )
 
 
+def _export_cursor(admin: str) -> int:
+    with db_connection() as con:
+        row = con.execute("SELECT last_id FROM export_cursors WHERE admin = ?", (admin,)).fetchone()
+    return row[0] if row else 0
+
+
+def _save_export_cursor(admin: str, last_id: int) -> None:
+    with db_connection() as con:
+        con.execute(
+            "INSERT INTO export_cursors (admin, last_id, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (admin) DO UPDATE SET last_id = max(last_id, excluded.last_id), updated_at = excluded.updated_at",
+            (admin, last_id, datetime.now(timezone.utc).isoformat()),
+        )
+        con.commit()
+
+
+@app.get("/admin/leads/delta")
+def admin_leads_delta(request: Request, format: str = "xlsx", after_id: Optional[int] = None):
+    """
+    Only the leads newer than a cursor (a lead id), oldest first. Without
+    after_id it continues from where this admin's last complete delta
+    download stopped, and moves that cursor once the body has been sent.
+    X-Lead-Cursor carries the id to pass as after_id next time.
+    """
+    admin = _session_user(request.cookies.get(ADMIN_COOKIE_NAME))
+    if admin is None:
+        return RedirectResponse(url="/admin/login", status_code=303)
+    if format not in LEAD_EXPORT_FORMATS:
+        return Response(f"format must be one of {', '.join(LEAD_EXPORT_FORMATS)}", status_code=400)
+    stored = after_id is None
+    after = _export_cursor(admin) if stored else max(0, after_id)
+
+    # Fix the upper bound before streaming so the cursor handed back covers
+    # exactly the rows sent, however many arrive meanwhile.
+    with db_connection() as con:
+        upto, count = con.execute(
+            "SELECT coalesce(max(id), ?1), count(*) FROM leads WHERE id > ?1", (after,)
+        ).fetchone()
+    stream, media_type = LEAD_EXPORT_FORMATS[format]
+    body = stream(" WHERE id > ? AND id <= ?", (after, upto))
+
+    if stored:
+        def body_then_save(chunks=body):
+            yield from chunks
+            _save_export_cursor(admin, upto)  # not reached if the client hangs up mid-download
+
+        body = body_then_save()
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="leads-after-{after}.{format}"',
+            "Cache-Control": "no-store",
+            "X-Lead-Cursor": str(upto),
+            "X-Lead-Count": str(count),
+        },
+    )
+
+
+ADMIN_LEADS_PAGE_SIZE = 50
+ADMIN_LEADS_MAX_PAGE_SIZE = 200
+
+
+def _lead_cursor(created_at: str, lead_id: int) -> str:
+    return _b64url_encode(f"{created_at}|{lead_id}".encode("utf-8"))
+
+
+def _parse_lead_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        created_at, _, lead_id = _b64url_decode(cursor).decode("utf-8").rpartition("|")
+        return created_at, int(lead_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("invalid page cursor")
+
+
+def lead_page(where: str, params: list, before: str = "", after: str = "",
+              limit: int = ADMIN_LEADS_PAGE_SIZE) -> tuple[list[tuple], str | None, str | None]:
+    """
+    One page of leads, newest first, by keyset on (created_at, id) rather than
+    OFFSET, so it's an index seek + `limit` rows however deep the page is.
+    `before`/`after` are cursors from a previous page; returns (rows, cursor
+    for the next older page, cursor for the next newer page).
+    """
+    params = list(params)
+    if after:
+        keyset, order = "(created_at, id) > (?, ?)", "ASC"
+        params += _parse_lead_cursor(after)
+    elif before:
+        keyset, order = "(created_at, id) < (?, ?)", "DESC"
+        params += _parse_lead_cursor(before)
+    else:
+        keyset, order = "", "DESC"
+    if keyset:
+        where = f"{where} AND {keyset}" if where else f" WHERE {keyset}"
+    with db_connection() as con:
+        rows = con.execute(
+            f"SELECT {', '.join(LEAD_EXPORT_COLUMNS)} FROM leads{where} "
+            f"ORDER BY created_at {order}, id {order} LIMIT ?",
+            params + [limit + 1],
+        ).fetchall()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if after:
+        rows.reverse()
+        older, newer = True, more
+    else:
+        older, newer = more, bool(before)
+    older_cursor = _lead_cursor(rows[-1][1], rows[-1][0]) if rows and older else None
+    newer_cursor = _lead_cursor(rows[0][1], rows[0][0]) if rows and newer else None
+    return rows, older_cursor, newer_cursor
+
+
+@app.get("/admin/leads", response_class=HTMLResponse)
+def admin_leads(
+    request: Request,
+    since: str = "",
+    until: str = "",
+    service: str = "",
+    suburb: str = "",
+    before: str = "",
+    after: str = "",
+    limit: int = ADMIN_LEADS_PAGE_SIZE,
+):
+    if not _verify_session(request.cookies.get(ADMIN_COOKIE_NAME)):
+        return RedirectResponse(url="/admin/login", status_code=303)
+    try:
+        where, params = _lead_filters(since, until, service, suburb)
+        rows, older, newer = lead_page(where, params, before, after, max(1, min(limit, ADMIN_LEADS_MAX_PAGE_SIZE)))
+    except ValueError as e:
+        return Response(str(e), status_code=400)
+
+    filters = {k: v for k, v in (("since", since), ("until", until), ("service", service), ("suburb", suburb)) if v}
+    esc = html.escape
+
+    def link(**cursor) -> str:
+        return "/admin/leads?" + urllib.parse.urlencode({**filters, **cursor})
+
+    body = "".join(
+        "<tr class='border-t border-slate-200 align-top'>"
+        f"<td class='py-2 pr-3 whitespace-nowrap text-slate-500'>{esc(created_at[:16].replace('T', ' '))}</td>"
+        f"<td class='py-2 pr-3 font-semibold'>{esc(name)}</td>"
+        f"<td class='py-2 pr-3 whitespace-nowrap'>{esc(phone)}<div class='text-slate-500'>{esc(email or '')}</div></td>"
+        f"<td class='py-2 pr-3'>{esc(suburb_)}</td>"
+        f"<td class='py-2 pr-3'>{esc(service_)}</td>"
+        f"<td class='py-2 text-slate-600'>{esc(message[:160])}</td>"
+        "</tr>"
+        for _id, created_at, name, phone, email, suburb_, service_, message, _page in rows
+    ) or "<tr><td colspan='6' class='py-6 text-center text-slate-500'>No leads match.</td></tr>"
+    nav = "".join([
+        f'<a class="btn btn-ghost" href="{esc(link(after=newer))}">← Newer</a>' if newer else "",
+        f'<a class="btn btn-ghost" href="{esc(link(before=older))}">Older →</a>' if older else "",
+    ])
+    content = f'''
+<section class="w-full px-6 md:px-10 pb-14 pt-10 md:pt-14">
+  <div class="card p-7">
+    <div class="flex items-center justify-between gap-4">
+      <div class="text-2xl font-black tracking-tight">Leads</div>
+      <div class="flex gap-2">
+        <a class="btn btn-ghost" href="/admin/search">Search</a>
+        <a class="btn btn-ghost" href="{esc("/admin/leads.xlsx?" + urllib.parse.urlencode({"source": "db", **filters}))}">Export these</a>
+        <a class="btn btn-ghost" href="/admin">Admin</a>
+      </div>
+    </div>
+    <form class="mt-5 grid gap-3 md:grid-cols-5" method="get" action="/admin/leads">
+      <input name="service" class="field" placeholder="Service (exact)" value="{esc(service)}"/>
+      <input name="suburb" class="field" placeholder="Suburb" value="{esc(suburb)}"/>
+      <input name="since" type="date" class="field" aria-label="Since" value="{esc(since)}"/>
+      <input name="until" type="date" class="field" aria-label="Until" value="{esc(until)}"/>
+      <button class="btn btn-primary" type="submit">Filter</button>
+    </form>
+    <div class="mt-5 overflow-x-auto">
+      <table class="w-full text-left text-sm">
+        <thead><tr class="text-xs uppercase text-slate-500">
+          <th class="py-2 pr-3">Received (UTC)</th><th class="py-2 pr-3">Name</th><th class="py-2 pr-3">Contact</th>
+          <th class="py-2 pr-3">Suburb</th><th class="py-2 pr-3">Service</th><th class="py-2">Message</th>
+        </tr></thead>
+        <tbody>{body}</tbody>
+      </table>
+    </div>
+    <div class="mt-5 flex justify-between">{nav}</div>
+  </div>
+</section>
+'''
+    return HTMLResponse(page("Leads", "/admin/leads", content))
+
+
+ADMIN_SEARCH_LIMIT = 50
+ADMIN_SEARCH_RANK_WINDOW = int(os.getenv("ADMIN_SEARCH_RANK_WINDOW", "2000"))
+_SEARCH_PHRASE_RE = re.compile(r'"([^"]*)"')
+_SEARCH_PHONE_RE = re.compile(r"\+?\d[\d\s\-().]{2,}\d")  # "0412 345 678", "(02) 9555-1234"
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+
+
+def _fts_query(q: str) -> str:
+    """
+    Free text -> FTS5 MATCH expression, every term ANDed. "Quoted phrases"
+    match exactly; phone-looking runs collapse to digits (see _FTS_PHONE for
+    the indexed side of +61 handling); every other word
+    is a prefix, so partial names and numbers match. User text only ever
+    ends up inside FTS5 strings, so it can't inject query syntax.
+    """
+    terms = [f'"{p}"' for p in _SEARCH_PHRASE_RE.findall(q) if p.strip()]
+    rest = _SEARCH_PHRASE_RE.sub(" ", q).replace('"', " ")
+    for m in _SEARCH_PHONE_RE.findall(rest):
+        digits = re.sub(r"\D", "", m)
+        # +61 searches also find numbers saved in local 0-prefixed form.
+        terms.append(f'("{digits}"* OR "0{digits[2:]}"*)' if digits.startswith("61") else f'"{digits}"*')
+    rest = _SEARCH_PHONE_RE.sub(" ", rest)
+    terms += [f'"{w}"*' for w in re.findall(r"\w+", rest)]
+    return " ".join(terms)
+
+
+def search_leads(q: str, limit: int = ADMIN_SEARCH_LIMIT) -> list[tuple]:
+    """
+    Best matches first (bm25, name and phone weighted highest) among the
+    newest ADMIN_SEARCH_RANK_WINDOW matches. Text columns come back with the
+    matched terms wrapped in _MARK_OPEN/_MARK_CLOSE.
+    """
+    match = _fts_query(q)
+    if not match:
+        return []
+    mark = f"'{_MARK_OPEN}', '{_MARK_CLOSE}'"
+    # bm25 costs a few µs per match and a common word can match most leads,
+    # so ranking is bounded to the newest matches (a cheap walk down the
+    # doclist). The query stays on leads_fts alone, ordered by plain `rank`,
+    # so FTS5 sorts first and only runs highlight()/snippet() on the rows kept.
+    with db_connection() as con:
+        hits = con.execute(
+            f"""
+            SELECT rowid,
+                   highlight(leads_fts, 0, {mark}), highlight(leads_fts, 1, {mark}),
+                   highlight(leads_fts, 2, {mark}), highlight(leads_fts, 3, {mark}),
+                   snippet(leads_fts, 4, {mark}, '…', 24)
+            FROM leads_fts
+            WHERE leads_fts MATCH ?1 AND rowid >= (
+              SELECT coalesce(min(rowid), 0) FROM (
+                SELECT rowid FROM leads_fts WHERE leads_fts MATCH ?1 ORDER BY rowid DESC LIMIT ?3
+              )
+            )
+            ORDER BY rank
+            LIMIT ?2
+            """,
+            (match, limit, ADMIN_SEARCH_RANK_WINDOW),
+        ).fetchall()
+        if not hits:
+            return []
+        leads = {
+            row[0]: row[1:]
+            for row in con.execute(
+                f"SELECT id, created_at, service, phone FROM leads WHERE id IN ({', '.join('?' * len(hits))})",
+                [hit[0] for hit in hits],
+            )
+        }
+    return [(hit[0], *leads[hit[0]], *hit[1:]) for hit in hits if hit[0] in leads]
+
+
+def _marked(text: str | None) -> str:
+    return html.escape(text or "").replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+@app.get("/admin/search", response_class=HTMLResponse)
+def admin_search(request: Request, q: str = "", limit: int = ADMIN_SEARCH_LIMIT):
+    if not _verify_session(request.cookies.get(ADMIN_COOKIE_NAME)):
+        return RedirectResponse(url="/admin/login", status_code=303)
+    rows = search_leads(q, max(1, min(limit, ADMIN_LEADS_MAX_PAGE_SIZE))) if q.strip() else []
+    esc = html.escape
+
+    body = "".join(
+        "<tr class='border-t border-slate-200 align-top'>"
+        f"<td class='py-2 pr-3 whitespace-nowrap text-slate-500'>{esc(created_at[:16].replace('T', ' '))}</td>"
+        f"<td class='py-2 pr-3 font-semibold'>{_marked(name)}</td>"
+        # The indexed phone is digits only; mark the stored one as a whole on a hit.
+        f"<td class='py-2 pr-3 whitespace-nowrap'>"
+        f"{f'<mark>{esc(phone)}</mark>' if _MARK_OPEN in phone_hit else esc(phone)}"
+        f"<div class='text-slate-500'>{_marked(email)}</div></td>"
+        f"<td class='py-2 pr-3'>{_marked(suburb)}</td>"
+        f"<td class='py-2 pr-3'>{esc(service)}</td>"
+        f"<td class='py-2 text-slate-600'>{_marked(message)}</td>"
+        "</tr>"
+        for _id, created_at, service, phone, name, phone_hit, email, suburb, message in rows
+    )
+    if q.strip() and not rows:
+        body = "<tr><td colspan='6' class='py-6 text-center text-slate-500'>No leads match.</td></tr>"
+    content = f'''
+<section class="w-full px-6 md:px-10 pb-14 pt-10 md:pt-14">
+  <div class="card p-7">
+    <div class="flex items-center justify-between gap-4">
+      <div class="text-2xl font-black tracking-tight">Search leads</div>
+      <div class="flex gap-2">
+        <a class="btn btn-ghost" href="/admin/leads">Browse</a>
+        <a class="btn btn-ghost" href="/admin">Admin</a>
+      </div>
+    </div>
+    <form class="mt-5 flex gap-3" method="get" action="/admin/search">
+      <input name="q" class="field flex-1" placeholder='Name, phone, email, suburb or words from the job, e.g. "feature wall"' value="{esc(q)}" autofocus/>
+      <button class="btn btn-primary" type="submit">Search</button>
+    </form>
+    <div class="mt-5 overflow-x-auto">
+      <table class="w-full text-left text-sm">
+        <thead><tr class="text-xs uppercase text-slate-500">
+          <th class="py-2 pr-3">Received (UTC)</th><th class="py-2 pr-3">Name</th><th class="py-2 pr-3">Contact</th>
+          <th class="py-2 pr-3">Suburb</th><th class="py-2 pr-3">Service</th><th class="py-2">Message</th>
+        </tr></thead>
+        <tbody>{body}</tbody>
+      </table>
+    </div>
+  </div>
+</section>
+'''
+    return HTMLResponse(page("Search leads", "/admin/search", content))
+
+
+DASHBOARD_BUCKETS = {"day": 30, "week": 12, "month": 12}  # how far back each period looks
+DASHBOARD_TOP = 10
+
+
+def dashboard_stats(period: str, today: date | None = None) -> dict:
+    """
+    Everything /admin/dashboard shows, read from lead_rollups and page_views
+    only: at most DASHBOARD_BUCKETS[period] buckets, so the cost doesn't grow
+    with the number of leads.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    buckets = []
+    day = today
+    for _ in range(DASHBOARD_BUCKETS[period]):
+        bucket = rollup_buckets(day)[period]
+        buckets.append(bucket)
+        day = date.fromisoformat(bucket) - timedelta(days=1)
+    buckets.reverse()
+    since = buckets[0]
+    with db_connection() as con:
+        totals = dict(con.execute(
+            "SELECT bucket, sum(leads) FROM lead_rollups WHERE period = ? AND dimension = 'service' AND bucket >= ? "
+            "GROUP BY bucket",
+            (period, since),
+        ).fetchall())
+        top = {
+            dimension: con.execute(
+                "SELECT value, sum(leads) AS n FROM lead_rollups WHERE period = ? AND dimension = ? AND bucket >= ? "
+                "GROUP BY value HAVING n > 0 ORDER BY n DESC, value LIMIT ?",
+                (period, dimension, since, DASHBOARD_TOP),
+            ).fetchall()
+            for dimension in ("service", "suburb")
+        }
+        page_leads = dict(con.execute(
+            "SELECT value, sum(leads) FROM lead_rollups WHERE period = ? AND dimension = 'page' AND bucket >= ? "
+            "GROUP BY value",
+            (period, since),
+        ).fetchall())
+        page_views = dict(con.execute(
+            "SELECT page, sum(views) FROM page_views WHERE period = ? AND bucket >= ? GROUP BY page",
+            (period, since),
+        ).fetchall())
+    pages = sorted(
+        ((p, page_views.get(p, 0), page_leads.get(p, 0)) for p in set(page_leads) | set(page_views)),
+        key=lambda row: (-row[2], -row[1], row[0]),
+    )
+    return {
+        "buckets": [(b, totals.get(b, 0)) for b in buckets],
+        "services": top["service"],
+        "suburbs": top["suburb"],
+        "pages": [(p, views, leads, leads / views if views else None) for p, views, leads in pages if views or leads],
+    }
+
+
+@app.get("/admin/dashboard", response_class=HTMLResponse)
+def admin_dashboard(request: Request, period: str = "day"):
+    if not _verify_session(request.cookies.get(ADMIN_COOKIE_NAME)):
+        return RedirectResponse(url="/admin/login", status_code=303)
+    if period not in DASHBOARD_BUCKETS:
+        return Response("period must be day, week or month", status_code=400)
+    stats = dashboard_stats(period)
+    esc = html.escape
+    total = sum(n for _, n in stats["buckets"])
+    peak = max((n for _, n in stats["buckets"]), default=0) or 1
+
+    bars = "".join(
+        f'<div class="flex-1 flex flex-col justify-end" title="{esc(bucket)}: {n}">'
+        f'<div class="rounded-t bg-sky-400" style="height:{n / peak * 100:.1f}%"></div></div>'
+        for bucket, n in stats["buckets"]
+    )
+
+    def ranked(rows) -> str:
+        return "".join(
+            f"<tr class='border-t border-slate-200'><td class='py-1.5 pr-3'>{esc(value or '—')}</td>"
+            f"<td class='py-1.5 text-right tabular-nums'>{n}</td></tr>"
+            for value, n in rows
+        ) or "<tr><td class='py-3 text-slate-500'>No leads yet.</td></tr>"
+
+    pages = "".join(
+        f"<tr class='border-t border-slate-200'><td class='py-1.5 pr-3'>{esc(p or '—')}</td>"
+        f"<td class='py-1.5 pr-3 text-right tabular-nums'>{views}</td>"
+        f"<td class='py-1.5 pr-3 text-right tabular-nums'>{leads}</td>"
+        f"<td class='py-1.5 text-right tabular-nums'>{f'{rate:.2%}' if rate is not None else '—'}</td></tr>"
+        for p, views, leads, rate in stats["pages"]
+    ) or "<tr><td colspan='4' class='py-3 text-slate-500'>No traffic yet.</td></tr>"
+    tabs = "".join(
+        f'<a class="btn {"btn-primary" if p == period else "btn-ghost"}" href="/admin/dashboard?period={p}">{p.title()}</a>'
+        for p in DASHBOARD_BUCKETS
+    )
+    first, last = stats["buckets"][0][0], stats["buckets"][-1][0]
+    content = f'''
+<section class="w-full px-6 md:px-10 pb-14 pt-10 md:pt-14">
+  <div class="card p-7">
+    <div class="flex items-center justify-between gap-4">
+      <div class="text-2xl font-black tracking-tight">Dashboard</div>
+      <div class="flex gap-2">{tabs}<a class="btn btn-ghost" href="/admin">Admin</a></div>
+    </div>
+    <div class="mt-5 text-sm text-slate-600">{total} leads, {esc(first)} to {esc(last)} (UTC, by {period})</div>
+    <div class="mt-3 flex h-40 items-stretch gap-1">{bars}</div>
+    <div class="mt-8 grid gap-8 md:grid-cols-3">
+      <div>
+        <div class="font-semibold">By service</div>
+        <table class="mt-2 w-full text-sm">{ranked(stats["services"])}</table>
+      </div>
+      <div>
+        <div class="font-semibold">Top suburbs</div>
+        <table class="mt-2 w-full text-sm">{ranked(stats["suburbs"])}</table>
+      </div>
+      <div>
+        <div class="font-semibold">Conversion by page</div>
+        <table class="mt-2 w-full text-sm">
+          <tr class="text-xs uppercase text-slate-500"><th class="py-1.5 pr-3 text-left">Page</th>
+            <th class="py-1.5 pr-3 text-right">Views</th><th class="py-1.5 pr-3 text-right">Leads</th><th class="py-1.5 text-right">Rate</th></tr>
+          {pages}
+        </table>
+      </div>
+    </div>
+  </div>
+</section>
+'''
+    return HTMLResponse(page("Dashboard", "/admin/dashboard", content))
+
+
 # -----------------------------
-# HTML shell
+# Export API for downstream jobs (CRM sync, analytics)
+#   GET /api/leads/export?format=ndjson|csv&since=&until=&after_id=&max_id=
+#   Authorization: Bearer <token from `python manage.py export-token`>
+# Streams with chunked transfer from its own read-only connection (so a long
+# export doesn't hold a pool slot), gzip'd on the fly when accepted. Jobs can
+# fetch id ranges in parallel: X-Lead-Max-Id is the top id the export stopped
+# at, and an after_id past the end returns just that header to split on.
 # -----------------------------
-def page(title: str, path: str, content: str) -> str:
-    year = datetime.now().year
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+EXPORT_API_FORMATS = ("ndjson", "csv")
 
-    def nav(href: str) -> str:
-        return "navItem active" if href == path else "navItem"
 
+def _export_connection() -> sqlite3.Connection:
+    con = sqlite3.connect(
+        f"file:{urllib.parse.quote(os.path.abspath(DB_PATH))}?mode=ro",
+        uri=True,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=False,  # a streamed body is pulled from threadpool threads
+    )
+    con.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    return con
 
-    return f"""<!doctype html>
-<html lang="en-AU">
-<head>
-  <meta charset="utf-8"/>
-  <meta name="viewport" content="width=device-width, initial-scale=1"/>
-  <title>{title} · {APP_NAME}</title>
-  <meta name="description" content="{TAGLINE}"/>
-  <meta name="theme-color" content="#070b14"/>
 
-  <script src="https://cdn.tailwindcss.com"></script>
-
-  <!-- GSAP animations -->
-  <script src="https://cdnjs.cloudflare.com/ajax/libs/gsap/3.12.5/gsap.min.js"></script>
-  <script src="https://cdnjs.cloudflare.com/ajax/libs/gsap/3.12.5/ScrollTrigger.min.js"></script>
-
-  <!-- HTMX for quote submit -->
-  <script src="https://unpkg.com/htmx.org@1.9.12"></script>
-
-  <style>
-    :root {{
-      --bg:#070b14;
-      --panel:rgba(255,255,255,.06);
-      --panel2:rgba(255,255,255,.04);
-      --line:rgba(255,255,255,.12);
-      --line2:rgba(255,255,255,.18);
-      --shadow:0 24px 70px rgba(0,0,0,.45);
-      --r2:26px;
-    }}
-    html{{scroll-behavior:smooth}}
-    body{{background:var(--bg)}}
-    .card{{ background: rgba(255,255,255,.75); border: 1px solid rgba(15,23,42,.08); box-shadow: 0 20px 60px rgba(2,6,23,.10); }}
-    .card2{{ background: rgba(255,255,255,.60); border: 1px solid rgba(15,23,42,.08); }}
-
-    .heroWrap{{
+def _gzip_chunks(chunks):
+    z = zlib.compressobj(EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip framing
+    for chunk in chunks:
+        if out := z.compress(chunk):
+            yield out
+    yield z.flush()
+
+
+def _export_body(stream, where: str, params: list, compress: bool):
+    con = _export_connection()
+    try:
+        chunks = stream(where, params, con)
+        yield from _gzip_chunks(chunks) if compress else chunks
+    finally:
+        con.close()
+
+
+@app.get("/api/leads/export")
+def api_export_leads(
+    request: Request,
+    format: str = "ndjson",
+    since: str = "",
+    until: str = "",
+    service: str = "",
+    suburb: str = "",
+    after_id: int = 0,
+    max_id: Optional[int] = None,
+):
+    auth = request.headers.get("authorization", "")
+    client = _export_client(auth[7:] if auth[:7].lower() == "bearer " else None)
+    if client is None and _session_user(request.cookies.get(ADMIN_COOKIE_NAME)) is None:
+        return Response("missing or invalid export token", status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    if format not in EXPORT_API_FORMATS:
+        return Response(f"format must be one of {', '.join(EXPORT_API_FORMATS)}", status_code=400)
+    try:
+        where, params = _lead_filters(since, until, service, suburb)
+    except ValueError as e:
+        return Response(str(e), status_code=400)
+
+    # Pin the upper id now: the export is then a fixed set of rows however
+    # many leads arrive while it streams.
+    with db_connection() as con:
+        upto = con.execute("SELECT coalesce(max(id), 0) FROM leads").fetchone()[0]
+    if max_id is not None:
+        upto = min(upto, max_id)
+    id_range = "id > ? AND id <= ?"
+    where = f"{where} AND {id_range}" if where else f" WHERE {id_range}"
+    params += [after_id, upto]
+
+    compress = "gzip" in _accepted_encodings(request.headers.get("accept-encoding", ""))
+    stream, media_type = LEAD_EXPORT_FORMATS[format]
+    headers = {"Cache-Control": "no-store", "Vary": "Accept-Encoding", "X-Lead-Max-Id": str(upto)}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    if client:
+        logger.info("lead export for %s: %s ids (%d, %d]", client, format, after_id, upto)
+    return StreamingResponse(_export_body(stream, where, params, compress), media_type=media_type, headers=headers)
+
+
+# -----------------------------
+# Page assets: critical CSS + fingerprinted bundles
+# Only above-the-fold CSS is inlined into each page. Everything else ships as
+# content-hashed /assets/* files with immutable caching, and each page pulls
+# in only the script modules its markup actually uses. Bundle names are
+# `<module>-<module>.<hash>.<ext>`, so any worker can rebuild one on demand.
+# -----------------------------
+CRITICAL_CSS = """
+:root {
+  --bg:#070b14;
+  --panel:rgba(255,255,255,.06);
+  --panel2:rgba(255,255,255,.04);
+  --line:rgba(255,255,255,.12);
+  --line2:rgba(255,255,255,.18);
+  --shadow:0 24px 70px rgba(0,0,0,.45);
+  --r2:26px;
+}
+html{scroll-behavior:smooth}
+body{background:var(--bg)}
+.card{ background: rgba(255,255,255,.75); border: 1px solid rgba(15,23,42,.08); box-shadow: 0 20px 60px rgba(2,6,23,.10); }
+.card2{ background: rgba(255,255,255,.60); border: 1px solid rgba(15,23,42,.08); }
+
+.heroWrap{
   width: 100%;
   background: linear-gradient(180deg, rgba(245,242,255,1) 0%, rgba(240,248,245,1) 100%);
   border-bottom: 1px solid rgba(15,23,42,.08);
-}}
-.heroInner{{
+}
+.heroInner{
   max-width: 1200px;
   margin: 0 auto;
   padding: 56px 28px;
-}}
-@media(min-width:768px){{
-  .heroInner{{ padding: 82px 36px; }}
-}}
-.heroImageCard{{
+}
+@media(min-width:768px){
+  .heroInner{ padding: 82px 36px; }
+}
+.heroImageCard{
   border-radius: 18px;
   overflow: hidden;
   box-shadow: 0 24px 60px rgba(2,6,23,.18);
   border: 1px solid rgba(15,23,42,.10);
   background: #fff;
-}}
-.heroImageCard img{{
+}
+.heroImageCard img{
   width: 100%;
   height: 100%;
   display:block;
   object-fit: cover;
-}}
-.statPill{{
+}
+.statPill{
   position:absolute;
   left:-26px;
   bottom: 26px;
@@ -498,8 +2340,8 @@ def page(title: str, path: str, content: str) -> str:
   box-shadow: 0 16px 40px rgba(2,6,23,.12);
   padding: 14px 18px;
   min-width: 170px;
-}}
-.navItem{{
+}
+.navItem{
   padding: 10px 14px;
   border-radius: 999px;
   font-weight: 800;
@@ -507,44 +2349,34 @@ def page(title: str, path: str, content: str) -> str:
   color: #0f172a;
   opacity: .75;
   transition: all .18s ease;
-}}
-.navItem:hover{{ opacity: 1; background: rgba(15,23,42,.06); }}
+}
+.navItem:hover{ opacity: 1; background: rgba(15,23,42,.06); }
 
-.navItem.active{{
+.navItem.active{
   opacity: 1;
   background: rgba(15,23,42,.10);
   box-shadow: inset 0 0 0 1px rgba(15,23,42,.10);
-}}
-.statCenter{{
+}
+.statCenter{
   left: 50%;
   top: 50%;
   bottom: auto;
   transform: translate(-50%, -50%);
-}}
-
-
-
+}
 
-    .btn{{border-radius:999px; padding:12px 16px; font-weight:900; font-size:14px; display:inline-flex; align-items:center; justify-content:center; gap:10px}}
-    .btn-primary{{ background:#0b1220; color:#fff; }}
-    .btn-primary:hover{{opacity:.92}}
-    .btn-ghost{{
+.btn{border-radius:999px; padding:12px 16px; font-weight:900; font-size:14px; display:inline-flex; align-items:center; justify-content:center; gap:10px}
+.btn-primary{ background:#0b1220; color:#fff; }
+.btn-primary:hover{opacity:.92}
+.btn-ghost{
   border:1px solid rgba(15,23,42,.12);
   background: rgba(255,255,255,.75);
   color: #0f172a;
-}}
-.btn-ghost:hover{{
+}
+.btn-ghost:hover{
   background: rgba(255,255,255,.95);
   border-color: rgba(15,23,42,.18);
-}}
-.noticeSuccess{{
-  background: #dcfce7;              /* green-100 */
-  border: 1px solid #86efac;        /* green-300 */
-  color: #064e3b;                   /* emerald-900 */
-}}
-.noticeSuccess .title{{ color:#064e3b; font-weight:900; }}
-.noticeSuccess .sub{{ color:#065f46; opacity:1; }}
-.field{{
+}
+.field{
   width:100%;
   border-radius:16px;
   border:1px solid rgba(15,23,42,.12);
@@ -552,13 +2384,12 @@ def page(title: str, path: str, content: str) -> str:
   padding:12px 14px;
   color:#0f172a;
   outline:none;
-}}
-.field::placeholder{{ color: rgba(71,85,105,.75); }}
-.field:focus{{ border-color: rgba(15,23,42,.22); background: rgba(255,255,255,.98); }}
-
+}
+.field::placeholder{ color: rgba(71,85,105,.75); }
+.field:focus{ border-color: rgba(15,23,42,.22); background: rgba(255,255,255,.98); }
 
-    /* premium animated background layer */
-    .bgGlow{{
+/* premium animated background layer */
+.bgGlow{
   position: fixed;
   inset: 0;
   z-index: -10;
@@ -566,42 +2397,335 @@ def page(title: str, path: str, content: str) -> str:
   background-size: cover;
   background-position: center;
   background-repeat: no-repeat;
-}}
-
-body{{ background: #ffffff; }}
-
-    /* hero canvas */
-    #paintCanvas{{border-radius:28px; border:1px solid rgba(255,255,255,.12); background:rgba(0,0,0,.25)}}
-
-    /* 3D tilt cards */
-    .tilt{{transform-style:preserve-3d; perspective:900px}}
-    .tiltInner{{transition: transform .12s ease; will-change: transform}}
-    .ink{{
-      position:absolute; inset:-40%;
-      background:
-        radial-gradient(500px 280px at 20% 20%, rgba(125,211,252,.18), transparent 60%),
-        radial-gradient(540px 300px at 80% 30%, rgba(196,181,253,.16), transparent 60%),    
-        radial-gradient(520px 320px at 45% 90%, rgba(52,211,153,.12), transparent 60%);
-      filter: blur(28px);
-      opacity:.0;
-      transition: opacity .25s ease;
-      pointer-events:none;
-    }}
-    .tilt:hover .ink{{opacity:.95}}
-
-    /* modal */
-    .modal{{position:fixed; inset:0; display:none; align-items:center; justify-content:center; padding:18px; z-index:80; background:rgba(0,0,0,.65); backdrop-filter:blur(10px)}}
-    .modal.open{{display:flex}}
-    .modalCard{{width:min(980px,100%); border-radius:28px; border:1px solid rgba(255,255,255,.12); background:rgba(2,6,23,.76); overflow:hidden; box-shadow:var(--shadow)}}
-
-    /* masonry-like */
-    .masonry{{columns:1; column-gap:14px}}
-    @media(min-width:768px){{.masonry{{columns:3}}}}
-    .mTile{{break-inside:avoid; margin-bottom:14px}}
-
-    /* reveal on scroll */
-    .reveal{{opacity:0; transform: translateY(18px)}}
-  </style>
+}
+
+body{ background: #ffffff; }
+
+/* masonry-like */
+.masonry{columns:1; column-gap:14px}
+@media(min-width:768px){.masonry{columns:3}}
+.mTile{break-inside:avoid; margin-bottom:14px}
+
+/* reveal on scroll */
+.reveal{opacity:0; transform: translateY(18px)}
+
+/* modal (hidden state must apply before the full stylesheet arrives) */
+.modal{position:fixed; inset:0; display:none; align-items:center; justify-content:center; padding:18px; z-index:80; background:rgba(0,0,0,.65); backdrop-filter:blur(10px)}
+.modal.open{display:flex}
+.modalCard{width:min(980px,100%); border-radius:28px; border:1px solid rgba(255,255,255,.12); background:rgba(2,6,23,.76); overflow:hidden; box-shadow:var(--shadow)}
+"""
+
+SITE_CSS = """
+.noticeSuccess{
+  background: #dcfce7;              /* green-100 */
+  border: 1px solid #86efac;        /* green-300 */
+  color: #064e3b;                   /* emerald-900 */
+}
+.noticeSuccess .title{ color:#064e3b; font-weight:900; }
+.noticeSuccess .sub{ color:#065f46; opacity:1; }
+
+/* 3D tilt cards */
+.tilt{transform-style:preserve-3d; perspective:900px}
+.tiltInner{transition: transform .12s ease; will-change: transform}
+.ink{
+  position:absolute; inset:-40%;
+  background:
+    radial-gradient(500px 280px at 20% 20%, rgba(125,211,252,.18), transparent 60%),
+    radial-gradient(540px 300px at 80% 30%, rgba(196,181,253,.16), transparent 60%),
+    radial-gradient(520px 320px at 45% 90%, rgba(52,211,153,.12), transparent 60%);
+  filter: blur(28px);
+  opacity:.0;
+  transition: opacity .25s ease;
+  pointer-events:none;
+}
+.tilt:hover .ink{opacity:.95}
+"""
+
+# Third-party libraries, vendored into static/vendor by `python manage.py vendor-js`
+# and concatenated ahead of the app modules in the same bundle. Until a library
+# has been vendored, pages fall back to a deferred tag for its CDN URL. The SRI
+# pin is the publisher's: vendor-js refuses a download that doesn't match it,
+# the bundle skips a vendored file that doesn't, and CDN tags carry it.
+VENDOR_DIR = os.path.join("static", "vendor")
+VENDOR_JS: dict[str, tuple[re.Pattern, str, str, str]] = {
+    # name -> (markup that needs it, vendored file, upstream URL, SRI pin)
+    "gsap": (
+        re.compile(r'class="[^"]*\breveal\b'),
+        os.path.join(VENDOR_DIR, "gsap-3.12.5.min.js"),
+        "https://cdnjs.cloudflare.com/ajax/libs/gsap/3.12.5/gsap.min.js",
+        "sha512-7eHRwcbYkK4d9g/6tD/mhkf++eoTHwpNM9woBxtPUBWm67zeAfFC+HrdoE2GanKeocly/VxeLvIqwvCdk7qScg==",
+    ),
+    "scrolltrigger": (
+        re.compile(r'class="[^"]*\breveal\b'),
+        os.path.join(VENDOR_DIR, "ScrollTrigger-3.12.5.min.js"),
+        "https://cdnjs.cloudflare.com/ajax/libs/gsap/3.12.5/ScrollTrigger.min.js",
+        "sha512-onMTRKJBKz8M1TnqqDuGBlowlH0ohFzMXYRNebz+yOcc5TQr/zAKsthzhuv0hiyUKEiQEQXEynnXCvNTOk50dg==",
+    ),
+    "htmx": (
+        re.compile(r"hx-(?:post|get)="),
+        os.path.join(VENDOR_DIR, "htmx-1.9.12.min.js"),
+        "https://unpkg.com/htmx.org@1.9.12/dist/htmx.min.js",
+        "sha384-ujb1lZYygJmzgSwoxRggbCHcjc0rB2XoQrxeTUQyRjrOnlCoYta87iKBWq3EsdM2",
+    ),
+}
+
+
+def sri_matches(data: bytes, integrity: str) -> bool:
+    """Whether data hashes to an SRI value such as "sha384-<base64>"."""
+    algo, _, expected = integrity.partition("-")
+    if algo not in ("sha256", "sha384", "sha512"):
+        return False
+    actual = base64.b64encode(hashlib.new(algo, data).digest()).decode("ascii")
+    return hmac.compare_digest(actual, expected)
+
+
+@lru_cache(maxsize=16)
+def _read_vendored(path: str, integrity: str, mtime_ns: int) -> str | None:
+    with open(path, "rb") as f:
+        data = f.read()
+    if not sri_matches(data, integrity):
+        logger.warning("%s doesn't match its pinned %s hash; serving the CDN copy", path, integrity.partition("-")[0])
+        return None
+    return data.decode("utf-8")
+
+
+def vendored_js(name: str) -> str | None:
+    """The vendored copy of a VENDOR_JS library, if present and matching its pin."""
+    _, path, _, integrity = VENDOR_JS[name]
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return _read_vendored(path, integrity, st.st_mtime_ns)
+
+
+JS_MODULES: dict[str, tuple[re.Pattern, str]] = {
+    # name -> (markup that needs it, source)
+    "quote": (re.compile(r'hx-post="/api/quote"'), """
+// ---- Quote form: show the load-shedding notice ----
+// htmx doesn't swap 4xx/5xx bodies by default; /api/quote's 503 carries a
+// "try again in a few seconds" fragment meant for #quoteResult. First in the
+// bundle, so a failed GSAP load can't stop it from registering.
+document.addEventListener("htmx:beforeSwap", (e) => {
+  if (e.detail.xhr.status === 503) {
+    e.detail.shouldSwap = true;
+    e.detail.isError = false;
+  }
+});
+"""),
+    "reveal": (re.compile(r'class="[^"]*\breveal\b'), """
+// ---- GSAP reveal-on-scroll ----
+gsap.registerPlugin(ScrollTrigger);
+document.querySelectorAll(".reveal").forEach((el) => {
+  gsap.to(el, {
+    opacity: 1,
+    y: 0,
+    duration: 0.8,
+    ease: "power2.out",
+    scrollTrigger: {
+      trigger: el,
+      start: "top 86%"
+    }
+  });
+});
+"""),
+    "tilt": (re.compile(r'class="[^"]*\btilt\b'), """
+// ---- 3D tilt cards ----
+function initTilt() {
+  document.querySelectorAll(".tilt").forEach((card) => {
+    const inner = card.querySelector(".tiltInner");
+    if (!inner) return;
+
+    function onMove(e) {
+      const r = card.getBoundingClientRect();
+      const px = (e.clientX - r.left) / r.width;
+      const py = (e.clientY - r.top) / r.height;
+      const rx = (py - 0.5) * -10;
+      const ry = (px - 0.5) * 14;
+      inner.style.transform = "rotateX(" + rx + "deg) rotateY(" + ry + "deg) translateZ(0)";
+    }
+    function onLeave() {
+      inner.style.transform = "rotateX(0deg) rotateY(0deg)";
+    }
+    card.addEventListener("mousemove", onMove);
+    card.addEventListener("mouseleave", onLeave);
+  });
+}
+initTilt();
+"""),
+    "modal": (re.compile(r"data-open="), """
+// ---- Portfolio modal ----
+const modal = document.getElementById("modal");
+const modalClose = document.getElementById("modalClose");
+const modalImg = document.getElementById("modalImg");
+const modalTitle = document.getElementById("modalTitle");
+
+function openModal(src, title) {
+  modalImg.src = src;
+  modalTitle.textContent = title;
+  modal.classList.add("open");
+  modal.setAttribute("aria-hidden","false");
+}
+function closeModal() {
+  modal.classList.remove("open");
+  modal.setAttribute("aria-hidden","true");
+}
+document.addEventListener("click", (e) => {
+  const t = e.target.closest("[data-open]");
+  if (t) openModal(t.dataset.open, t.dataset.title || "Project");
+  if (e.target === modal || e.target === modalClose) closeModal();
+});
+document.addEventListener("keydown", (e)=>{ if(e.key==="Escape") closeModal(); });
+"""),
+    "youtube": (re.compile(r"data-youtube="), """
+// ---- Click-to-load YouTube facades (see video_card) ----
+(function() {
+  const origins = [
+    "https://www.youtube-nocookie.com",
+    "https://www.google.com",
+    "https://googleads.g.doubleclick.net",
+    "https://static.doubleclick.net"
+  ];
+  let warmed = false;
+  function warm() {
+    if (warmed) return;
+    warmed = true;
+    origins.forEach((href) => {
+      const l = document.createElement("link");
+      l.rel = "preconnect";
+      l.href = href;
+      document.head.appendChild(l);
+    });
+  }
+  document.querySelectorAll("[data-youtube]").forEach((btn) => {
+    btn.addEventListener("pointerover", warm, {once: true});
+    btn.addEventListener("focus", warm, {once: true});
+    btn.addEventListener("click", () => {
+      warm();
+      const f = document.createElement("iframe");
+      f.className = "h-full w-full";
+      f.src = "https://www.youtube-nocookie.com/embed/" + encodeURIComponent(btn.dataset.youtube) + "?rel=0&modestbranding=1&autoplay=1";
+      f.title = btn.dataset.title || "Video";
+      f.allow = "accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture; web-share";
+      f.allowFullscreen = true;
+      f.setAttribute("frameborder", "0");
+      btn.replaceWith(f);
+      f.focus();
+    });
+  });
+})();
+"""),
+}
+
+
+def _js_source(name: str) -> str | None:
+    if name in JS_MODULES:
+        return JS_MODULES[name][1]
+    if name in VENDOR_JS:
+        return vendored_js(name)
+    return None
+
+
+def _js_stem_ok(stem: str) -> bool:
+    # Only stems page_scripts() can emit: known names, each at most once, in
+    # VENDOR_JS then JS_MODULES order.
+    order = {name: i for i, name in enumerate([*VENDOR_JS, *JS_MODULES])}
+    positions = [order.get(name, -1) for name in stem.split("-")]
+    return -1 not in positions and all(a < b for a, b in zip(positions, positions[1:]))
+
+
+def _bundle_source(stem: str, ext: str) -> str | None:
+    if ext == "css":
+        return SITE_CSS if stem == "site" else None
+    if ext == "js" and _js_stem_ok(stem):
+        sources = [_js_source(n) for n in stem.split("-")]
+        if all(src is not None for src in sources):
+            return "\n;\n".join(sources)
+    return None
+
+
+@lru_cache(maxsize=64)
+def _bundle(stem: str, ext: str) -> tuple[str, CachedBody, str] | None:
+    source = _bundle_source(stem, ext)
+    if source is None:
+        return None
+    data = source.encode("utf-8")
+    integrity = "sha384-" + base64.b64encode(hashlib.sha384(data).digest()).decode("ascii")
+    body = CachedBody(data)
+    return f"/assets/{stem}.{body.digest[:10]}.{ext}", body, integrity
+
+
+def bundle_url(stem: str, ext: str) -> str:
+    return _bundle(stem, ext)[0]
+
+
+def page_scripts(content: str) -> str:
+    """
+    Script tags for a page: one deferred, SRI-pinned bundle holding the vendored
+    libraries and app modules its markup needs (GSAP only with .reveal, htmx only
+    with an hx-post form, ...), plus SRI-pinned CDN tags for libraries not
+    vendored yet.
+    """
+    names: list[str] = []
+    tags: list[str] = []
+    for name, (needs, _, url, integrity) in VENDOR_JS.items():
+        if needs.search(content):
+            if vendored_js(name) is not None:
+                names.append(name)
+            else:
+                tags.append(f'<script src="{url}" integrity="{integrity}" crossorigin="anonymous" defer></script>')
+    names += [name for name, (needs, _) in JS_MODULES.items() if needs.search(content)]
+    if names:
+        url, _, integrity = _bundle("-".join(names), "js")
+        tags.append(f'<script src="{url}" integrity="{integrity}" defer></script>')
+    return "\n  ".join(tags)
+
+
+@app.get("/assets/{filename}")
+def assets(request: Request, filename: str):
+    stem, _, rest = filename.partition(".")
+    digest, _, ext = rest.partition(".")
+    # Check the digest on the raw source first: compressing (gzip-9, brotli-11)
+    # and caching only happen for a URL some page has actually been given.
+    source = _bundle_source(stem, ext)
+    if source is None or body_digest(source.encode("utf-8"))[:10] != digest:
+        return Response("Not found", status_code=404, media_type="text/plain")
+    hit = _bundle(stem, ext)
+    media_type = "text/css; charset=utf-8" if ext == "css" else "application/javascript; charset=utf-8"
+    return encoded_response(request, hit[1], media_type, CACHE_IMMUTABLE)
+
+
+# -----------------------------
+# HTML shell
+# -----------------------------
+def page(title: str, path: str, content: str) -> str:
+    with PAGE_RENDER_SECONDS.time(path):
+        return _page_html(title, path, content)
+
+
+def _page_html(title: str, path: str, content: str) -> str:
+    year = datetime.now().year
+
+    def nav(href: str) -> str:
+        return "navItem active" if href == path else "navItem"
+
+    site_css = bundle_url("site", "css")
+    scripts = page_scripts(content)
+
+    return f"""<!doctype html>
+<html lang="en-AU">
+<head>
+  <meta charset="utf-8"/>
+  <meta name="viewport" content="width=device-width, initial-scale=1"/>
+  <title>{title} · {APP_NAME}</title>
+  <meta name="description" content="{TAGLINE}"/>
+  <meta name="theme-color" content="#070b14"/>
+
+  {tailwind_tag()}
+
+  <style>{CRITICAL_CSS}</style>
+  <link rel="preload" as="style" href="{site_css}" onload="this.onload=null;this.rel='stylesheet'"/>
+  <noscript><link rel="stylesheet" href="{site_css}"/></noscript>
 </head>
 
 <body class="min-h-screen text-slate-900">
@@ -612,9 +2736,7 @@ body{{ background: #ffffff; }}
         
         <!-- Left: Logo + name -->
         <a href="/" class="flex items-center gap-4">
-        <img src="/static/logo.png"
-            class="h-14 w-14 object-contain"
-            alt={APP_NAME}/>
+        {responsive_img("/static/logo.png", APP_NAME, "56px", "h-14 w-14 object-contain", lazy=False)}
         <div class="leading-tight">
             <div class="text-lg font-extrabold tracking-tight text-slate-900">{APP_NAME}</div>
             <div class="text-sm text-slate-600">{TAGLINE}</div>
@@ -649,7 +2771,7 @@ body{{ background: #ffffff; }}
       <div class="grid gap-6 md:grid-cols-3">
         <div class="card2 p-6">
           <div class="flex items-center gap-3">
-            <img src="/static/logo.png" class="h-9 w-9" alt=""/>
+            {responsive_img("/static/logo.png", "", "36px", "h-9 w-9")}
             <div class="text-base font-extrabold">{APP_NAME}</div>
           </div>
           <p class="mt-3 text-sm text-slate-600">Prep-first painting. Premium materials. Clean, respectful service.</p>
@@ -685,144 +2807,80 @@ body{{ background: #ffffff; }}
     </div>
   </footer>
 
-  <script>
-    // ---- GSAP reveal-on-scroll ----
-    gsap.registerPlugin(ScrollTrigger);
-    document.querySelectorAll(".reveal").forEach((el) => {{
-      gsap.to(el, {{
-        opacity: 1,
-        y: 0,
-        duration: 0.8,
-        ease: "power2.out",
-        scrollTrigger: {{
-          trigger: el,
-          start: "top 86%"
-        }}
-      }});
-    }});
-
-    // ---- 3D tilt cards ----
-    function initTilt() {{
-      document.querySelectorAll(".tilt").forEach((card) => {{
-        const inner = card.querySelector(".tiltInner");
-        if (!inner) return;
-
-        function onMove(e) {{
-          const r = card.getBoundingClientRect();
-          const px = (e.clientX - r.left) / r.width;
-          const py = (e.clientY - r.top) / r.height;
-          const rx = (py - 0.5) * -10;
-          const ry = (px - 0.5) * 14;
-          inner.style.transform = "rotateX(" + rx + "deg) rotateY(" + ry + "deg) translateZ(0)";
-        }}
-        function onLeave() {{
-          inner.style.transform = "rotateX(0deg) rotateY(0deg)";
-        }}
-        card.addEventListener("mousemove", onMove);
-        card.addEventListener("mouseleave", onLeave);
-      }});
-    }}
-    initTilt();
-
-    // ---- Portfolio modal ----
-    const modal = document.getElementById("modal");
-    const modalClose = document.getElementById("modalClose");
-    const modalImg = document.getElementById("modalImg");
-    const modalTitle = document.getElementById("modalTitle");
-
-    function openModal(src, title) {{
-      modalImg.src = src;
-      modalTitle.textContent = title;
-      modal.classList.add("open");
-      modal.setAttribute("aria-hidden","false");
-    }}
-    function closeModal() {{
-      modal.classList.remove("open");
-      modal.setAttribute("aria-hidden","true");
-    }}
-    document.addEventListener("click", (e) => {{
-      const t = e.target.closest("[data-open]");
-      if (t) openModal(t.dataset.open, t.dataset.title || "Project");
-      if (e.target === modal || e.target === modalClose) closeModal();
-    }});
-    document.addEventListener("keydown", (e)=>{{ if(e.key==="Escape") closeModal(); }});
-
-    // ---- Animated “paint flow” canvas (lightweight, no libs) ----
-    (function() {{
-      const c = document.getElementById("paintCanvas");
-      if (!c) return;
-      const ctx = c.getContext("2d");
-      let w=0,h=0,t=0;
-
-      function resize() {{
-        const dpr = Math.min(2, window.devicePixelRatio || 1);
-        const rect = c.getBoundingClientRect();
-        w = Math.floor(rect.width * dpr);
-        h = Math.floor(rect.height * dpr);
-        c.width = w; c.height = h;
-        ctx.setTransform(1,0,0,1,0,0);
-      }}
-      window.addEventListener("resize", resize);
-      resize();
-
-      function blob(x,y,r,alpha, col) {{
-        const g = ctx.createRadialGradient(x,y,0,x,y,r);
-        g.addColorStop(0, col.replace("ALPHA", String(alpha)));
-        g.addColorStop(1, col.replace("ALPHA", "0"));
-        ctx.fillStyle = g;
-        ctx.beginPath(); ctx.arc(x,y,r,0,Math.PI*2); ctx.fill();
-      }}
-
-      function loop() {{
-        t += 0.012;
-        ctx.clearRect(0,0,w,h);
-
-        // base wash
-        ctx.fillStyle = "rgba(0,0,0,0.18)";
-        ctx.fillRect(0,0,w,h);
-
-        // moving blobs (paint)
-        const cols = [
-          "rgba(125,211,252,ALPHA)",
-          "rgba(196,181,253,ALPHA)",
-          "rgba(52,211,153,ALPHA)"
-        ];
-
-        for (let i=0;i<14;i++) {{
-          const k = i * 0.45;
-          const x = (0.5 + 0.42*Math.sin(t*1.2 + k)) * w;
-          const y = (0.5 + 0.36*Math.cos(t*1.05 + k*1.3)) * h;
-          const r = (0.14 + 0.08*Math.sin(t + k)) * Math.min(w,h);
-          blob(x,y,r,0.22, cols[i%cols.length]);
-        }}
-
-        // subtle streaks
-        ctx.globalAlpha = 0.12;
-        ctx.strokeStyle = "white";
-        ctx.lineWidth = Math.max(1, Math.min(6, w/260));
-        ctx.beginPath();
-        for(let x=0; x<w; x+=w/14) {{
-          const yy = h*0.55 + Math.sin(t*1.8 + x*0.01)*h*0.08;
-          ctx.moveTo(x, yy);
-          ctx.quadraticCurveTo(x+w*0.08, yy-h*0.06, x+w*0.16, yy+h*0.02);
-        }}
-        ctx.stroke();
-        ctx.globalAlpha = 1;
-
-        requestAnimationFrame(loop);
-      }}
-      loop();
-    }})();
-  </script>
+  {scripts}
 </body>
 </html>
 """
 
 
+# -----------------------------
+# Page cache
+# The marketing pages don't depend on the request, so each one is rendered once
+# and kept as encoded bytes. An entry is rebuilt when the footer year rolls over
+# or when any of the content constants the templates read have changed.
+# -----------------------------
+PAGE_CACHE_CHECK_SECONDS = 1.0
+_page_cache: dict[str, tuple[tuple, CachedBody]] = {}
+_cached_pages: dict[str, Callable[..., HTMLResponse]] = {}
+_page_cache_checked: tuple[float, tuple] = (float("-inf"), ())
+
+
+def _page_cache_version() -> tuple:
+    # Fingerprinting the constants is cheap but not free; re-check at most once a second.
+    global _page_cache_checked
+    checked_at, version = _page_cache_checked
+    now = time.monotonic()
+    if now - checked_at >= PAGE_CACHE_CHECK_SECONDS:
+        content = repr((APP_NAME, TAGLINE, SERVICE_AREA, PORTFOLIO_ITEMS, LEARN_PREVIEW, _build_stamp())).encode("utf-8")
+        version = (datetime.now().year, hashlib.blake2b(content, digest_size=8).hexdigest())
+        _page_cache_checked = (now, version)
+    return version
+
+
+def cached_page(fn: Callable[..., HTMLResponse]) -> Callable[..., HTMLResponse]:
+    """
+    Route decorator for request-independent HTML pages (apply under @app.get).
+    The wrapped handler only runs on a cache miss; hits reuse the stored bytes,
+    their precompressed variants and ETag (so revalidations are 304s).
+    """
+    key = fn.__name__
+    _cached_pages[key] = fn
+
+    @wraps(fn)
+    def wrapper(request: Request) -> Response:
+        version = _page_cache_version()
+        hit = _page_cache.get(key)
+        if hit is None or hit[0] != version:
+            hit = _page_cache[key] = (version, CachedBody(bytes(fn(request).body)))
+        return encoded_response(request, hit[1], "text/html; charset=utf-8")
+
+    return wrapper
+
+
+def warm_page_cache() -> None:
+    # Entries that are already current are left alone: a pre-forked worker
+    # re-running this at startup must not rewrite (and un-share) the parent's copy.
+    version = _page_cache_version()
+    for key, fn in _cached_pages.items():
+        hit = _page_cache.get(key)
+        if hit is None or hit[0] != version:
+            _page_cache[key] = (version, CachedBody(bytes(fn(None).body)))
+
+
+def warm_render_caches() -> None:
+    """Renders every cached page, their asset bundles and the generated SVGs."""
+    warm_page_cache()
+    _brandmark_body()
+    _figma_bg_body()
+    for seed in range(ART_VARIANTS):
+        _art_body(seed)
+
+
 # -----------------------------
 # Routes
 # -----------------------------
 @app.get("/", response_class=HTMLResponse)
+@cached_page
 def home(request: Request):
     content = f"""
 <section class="heroWrap">
@@ -859,7 +2917,7 @@ def home(request: Request):
 
       <div class="relative">
         <div class="heroImageCard">
-          <img src="/static/hero-collage.png" alt="Residential and commercial painting projects"/>
+          {responsive_img("/static/hero-collage.png", "Residential and commercial painting projects", "(min-width: 768px) 600px, 100vw", lazy=False)}
         </div>
 
         <div class="statPill statCenter">
@@ -895,9 +2953,9 @@ def home(request: Request):
     <h2 class="text-2xl font-black tracking-tight">Work in action (video)</h2>
 
     <div class="mt-6 grid gap-5 md:grid-cols-3">
-      {video_card("Exterior repaint time-lapse", "")}
-      {video_card("Interior painting time-lapse", "")}
-      {video_card("Commercial spray painting time-lapse", "")}
+      {video_card("Exterior repaint time-lapse", "", "/static/residential.png")}
+      {video_card("Interior painting time-lapse", "", "/static/finish.png")}
+      {video_card("Commercial spray painting time-lapse", "", "/static/commercial.png")}
     </div>
   </div>
 </section>
@@ -973,7 +3031,7 @@ def home(request: Request):
       <button id="modalClose" class="btn btn-ghost py-2 px-3 text-xs">Close</button>
     </div>
     <div class="bg-black/5 p-4">
-      <img id="modalImg" class="w-full max-h-[70vh] object-contain bg-white/5" src="/static/portfolio/portfolio-1.png" alt="Preview"/>
+      <img id="modalImg" class="w-full max-h-[70vh] object-contain bg-white/5" src="{static_url('/static/portfolio/portfolio-1.png')}" alt="Preview"/>
     </div>
     <div class="grid gap-4 px-5 py-5 md:grid-cols-3">
       <div class="card2 p-4">
@@ -1014,9 +3072,9 @@ def portfolio_tile(img: str, title: str, subtitle: str) -> str:
     return f"""
 <div class="mTile">
   <button class="w-full text-left card2 overflow-hidden hover:opacity-[.98]"
-          data-open="{img}"
+          data-open="{static_url(img)}"
           data-title="{title}">
-    <img src="{img}" alt="{title}" class="w-full h-[240px] object-cover"/>
+    {responsive_img(img, title, "(min-width: 768px) 33vw, 100vw", "w-full h-[240px] object-cover")}
     <div class="p-4">
       <div class="text-sm font-extrabold">{title}</div>
       <div class="mt-1 text-xs text-slate-600">{subtitle}</div>
@@ -1026,26 +3084,44 @@ def portfolio_tile(img: str, title: str, subtitle: str) -> str:
 """
 
 
-def video_card(title: str, youtube_id: str) -> str:
+def video_card(title: str, youtube_id: str, poster: str) -> str:
+    """
+    Poster + play button; the "youtube" JS module swaps in the real player on
+    click, so the ~1 MB YouTube embed only loads for visitors who press play.
+    `poster` is a /static image (served from the asset build) or an /img URL.
+    Cards without a video ID show the poster only.
+    """
+    if poster.startswith("/static/"):
+        img = responsive_img(poster, "", "(min-width: 768px) 33vw, 100vw", "h-full w-full object-cover")
+    else:
+        img = f'<img src="{poster}" alt="" class="h-full w-full object-cover" loading="lazy" decoding="async"/>'
+    if youtube_id:
+        media = f"""
+    <button type="button" class="group relative block h-full w-full"
+      data-youtube="{youtube_id}" data-title="{title}" aria-label="Play video: {title}">
+      {img}
+      <span class="absolute inset-0 grid place-items-center">
+        <span class="grid h-14 w-14 place-items-center rounded-full bg-black/60 text-white transition group-hover:bg-red-600" aria-hidden="true">&#9654;</span>
+      </span>
+    </button>"""
+        note = "Embedded example video"
+    else:
+        media = img
+        note = "Video coming soon"
     return f"""
 <div class="card2 overflow-hidden">
-  <div class="aspect-video bg-black/30">
-    <iframe class="h-full w-full"
-      src="https://www.youtube.com/embed/{youtube_id}?rel=0&modestbranding=1"
-      title="{title}"
-      frameborder="0"
-      allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture; web-share"
-      allowfullscreen></iframe>
+  <div class="aspect-video bg-black/30">{media}
   </div>
   <div class="p-4">
     <div class="text-sm font-extrabold">{title}</div>
-    <div class="mt-1 text-xs text-slate-600">Embedded example video</div>
+    <div class="mt-1 text-xs text-slate-600">{note}</div>
   </div>
 </div>
 """
 
 
 @app.get("/services", response_class=HTMLResponse)
+@cached_page
 def services(request: Request):
     content = f"""
 <section class="w-full px-6 md:px-10 pb-14 pt-10 md:pt-14">
@@ -1156,7 +3232,7 @@ def learn_layout(
 
       <div class="relative">
         <div class="heroImageCard">
-          <img src="{preview}" alt="{title} preview"/>
+          {responsive_img(preview, f"{title} preview", "(min-width: 768px) 600px, 100vw", lazy=False)}
         </div>
       </div>
     </div>
@@ -1201,6 +3277,7 @@ def learn_layout(
 """
 
 @app.get("/learn/residential", response_class=HTMLResponse)
+@cached_page
 def learn_residential(request: Request):
     content = learn_layout(
         slug="residential",
@@ -1234,6 +3311,7 @@ def learn_residential(request: Request):
 
 
 @app.get("/learn/commercial", response_class=HTMLResponse)
+@cached_page
 def learn_commercial(request: Request):
     content = learn_layout(
         slug="commercial",
@@ -1266,6 +3344,7 @@ def learn_commercial(request: Request):
 
 
 @app.get("/learn/prep", response_class=HTMLResponse)
+@cached_page
 def learn_prep(request: Request):
     content = learn_layout(
         slug="prep",
@@ -1298,6 +3377,7 @@ def learn_prep(request: Request):
 
 
 @app.get("/learn/premium-finish", response_class=HTMLResponse)
+@cached_page
 def learn_premium_finish(request: Request):
     content = learn_layout(
         slug="finish",
@@ -1331,6 +3411,7 @@ def learn_premium_finish(request: Request):
 
 
 @app.get("/portfolio", response_class=HTMLResponse)
+@cached_page
 def portfolio(request: Request):
     content = """
 <section class="w-full px-6 md:px-10 pb-14 pt-10 md:pt-14">
@@ -1342,7 +3423,7 @@ def portfolio(request: Request):
   </div>
 
   <div class="mt-8 masonry reveal">
-    """ + "".join(portfolio_tile(p["img"], p["title"], p["subtitle"]) for p in PORTFOLIO_ITEMS) + """
+    """ + "".join(portfolio_tile(p["img"], p["title"], p["subtitle"]) for p in PORTFOLIO_ITEMS) + f"""
   </div>
 </section>
 
@@ -1355,7 +3436,7 @@ def portfolio(request: Request):
       <button id="modalClose" class="btn btn-ghost py-2 px-3 text-xs">Close</button>
     </div>
     <div class="bg-black/5 p-4">
-      <img id="modalImg" class="w-full max-h-[70vh] object-contain bg-white/5" src="/static/portfolio/portfolio-1.png" alt="Preview"/>
+      <img id="modalImg" class="w-full max-h-[70vh] object-contain bg-white/5" src="{static_url('/static/portfolio/portfolio-1.png')}" alt="Preview"/>
     </div>
   </div>
 </div>
@@ -1364,6 +3445,7 @@ def portfolio(request: Request):
 
 
 @app.get("/contact", response_class=HTMLResponse)
+@cached_page
 def contact(request: Request):
     content = """
 <section class="w-full px-6 md:px-10 pb-14 pt-10 md:pt-14">
@@ -1418,8 +3500,21 @@ def contact(request: Request):
     return HTMLResponse(page("Contact", "/contact", content))
 
 
+_persist_tasks: set[asyncio.Task] = set()  # strong refs until each finishes
+
+
+async def _persist_lead(saved: Future, lead: dict) -> None:
+    # Resolves once the group commit carrying this row is on disk.
+    with LEAD_COMMIT_WAIT_SECONDS.time():
+        await asyncio.wrap_future(saved)
+    # run_in_executor doesn't carry contextvars over; copy them so the append
+    # still counts towards this request's Server-Timing.
+    ctx = contextvars.copy_context()
+    await asyncio.get_running_loop().run_in_executor(_ingest_executor, ctx.run, append_lead_to_excel, lead)
+
+
 @app.post("/api/quote", response_class=HTMLResponse)
-def quote(
+async def quote(
     request: Request,
     name: str = Form(...),
     phone: str = Form(...),
@@ -1435,7 +3530,7 @@ def quote(
     suburb = (suburb or "").strip()
     service = (service or "").strip()
     message = (message or "").strip()
-    page = (page or "/").strip()
+    page = rollup_page((page or "/").strip())
 
     errors = []
     if len(name) < 2:
@@ -1461,15 +3556,19 @@ def quote(
         )
 
     created_at = datetime.now(timezone.utc).isoformat()
-    with sqlite3.connect(DB_PATH) as con:
-        con.execute(
+    try:
+        saved = submit_lead((created_at, name, phone, email, suburb, service, message, page))
+    except queue.Full:
+        return HTMLResponse(
             """
-            INSERT INTO leads (created_at, name, phone, email, suburb, service, message)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            <div class="mt-3 rounded-2xl border border-amber-400/30 bg-amber-50 p-4 text-amber-900">
+              <div class="font-semibold">We’re receiving a lot of requests right now.</div>
+              <div class="mt-1 text-sm">Nothing was saved — please try again in a few seconds.</div>
+            </div>
             """,
-            (created_at, name, phone, email, suburb, service, message),
+            status_code=503,
+            headers={"Retry-After": str(INGEST_RETRY_AFTER_SECONDS)},
         )
-        con.commit()
     lead = {
         "created_at": datetime.utcnow().isoformat(timespec="seconds"),
         "name": name,
@@ -1480,8 +3579,12 @@ def quote(
         "message": message,
         "ip": request.client.host if request.client else "",
     }
-
-    append_lead_to_excel(lead)
+    # The row is already queued; a client hanging up now must not stop the
+    # journal append, so the rest runs as its own task behind a shield.
+    task = asyncio.create_task(_persist_lead(saved, lead))
+    _persist_tasks.add(task)
+    task.add_done_callback(_persist_tasks.discard)
+    await asyncio.shield(task)
 
     email_part = f" or <span class='font-semibold'>{email}</span>" if email else ""
     return HTMLResponse(
@@ -1499,6 +3602,15 @@ def quote(
     )
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    if METRICS_TOKEN and not hmac.compare_digest(
+        request.headers.get("authorization", ""), f"Bearer {METRICS_TOKEN}"
+    ):
+        return Response("Unauthorized", status_code=401, media_type="text/plain")
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/robots.txt")
 def robots():
     return Response("User-agent: *\nAllow: /\nSitemap: /sitemap.xml\n", media_type="text/plain")
@@ -1513,4 +3625,238 @@ def sitemap():
         *[f"  <url><loc>{p}</loc></url>" for p in pages],
         "</urlset>",
     ]
-    return Response("\n".join(xml), media_type="application/xml")
\ No newline at end of file
+    return Response("\n".join(xml), media_type="application/xml")
+
+
+
+# -----------------------------
+# Request timing: metrics, Server-Timing and the admin profiler
+# Every response gets `Server-Timing: render;dur=.., db;dur=.., excel;dur=..,
+# total;dur=..` (ms, spans only when non-zero; total is time to the response
+# headers). A signed-in admin can append ?__profile=1 to any URL to get a
+# sampled call tree of that request as HTML instead of the response, or
+# ?__profile=speedscope for a file to open at https://www.speedscope.app.
+# The sampler sees every thread in the worker, so concurrent requests show up
+# too; idle threads (waiting on selectors/queues/conditions) are skipped.
+# -----------------------------
+PROFILE_INTERVAL_SECONDS = 0.001
+PROFILE_IDLE_LEAVES = {("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get")}
+PROFILE_MODES = {"1": "html", "html": "html", "speedscope": "speedscope"}  # ?__profile= value -> output
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, interval: float):
+        super().__init__(name="profiler", daemon=True)
+        self.interval = interval
+        self.halt = threading.Event()
+        self.samples: list[tuple[int, tuple, float]] = []  # (thread id, root->leaf stack, seconds)
+
+    def run(self) -> None:
+        me = threading.get_ident()
+        last = time.perf_counter()
+        while not self.halt.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                if (os.path.basename(stack[0][1]), stack[0][0]) in PROFILE_IDLE_LEAVES:
+                    continue
+                stack.reverse()
+                self.samples.append((tid, tuple(stack), weight))
+
+
+def _profile_html(samples: list, title: str, wall: float) -> str:
+    tree: dict = {}
+    total = sum(w for _, _, w in samples) or 1.0
+    for _, stack, weight in samples:
+        level = tree
+        for frame in stack:
+            node = level.setdefault(frame, [0.0, {}])
+            node[0] += weight
+            level = node[1]
+
+    def render(level: dict) -> str:
+        out = []
+        for (name, filename, line), (weight, children) in sorted(level.items(), key=lambda kv: -kv[1][0]):
+            if weight / total < 0.005:
+                continue
+            label = (f"<b>{weight * 1000:.1f} ms</b> {weight / total:.0%} {html.escape(name)} "
+                     f"<span>{html.escape(os.path.relpath(filename))}:{line}</span>")
+            inner = render(children)
+            out.append(f"<details open><summary>{label}</summary>{inner}</details>" if inner else f"<div>{label}</div>")
+        return "".join(out)
+
+    return f"""<!doctype html><meta charset="utf-8"><title>Profile: {html.escape(title)}</title>
+<style>body{{font:13px ui-monospace,monospace;margin:20px}}details,div{{margin-left:14px}}
+summary,div{{white-space:nowrap}}span{{color:#888}}</style>
+<h3>{html.escape(title)}</h3>
+<p>{wall * 1000:.1f} ms wall, {len(samples)} samples every {PROFILE_INTERVAL_SECONDS * 1000:g} ms
+(all non-idle threads in this worker)</p>{render(tree)}"""
+
+
+def _profile_speedscope(samples: list, title: str) -> dict:
+    frames: dict[tuple, int] = {}
+    profiles: dict[int, dict] = {}
+    for tid, stack, weight in samples:
+        p = profiles.setdefault(tid, {
+            "type": "sampled", "name": f"thread {tid}", "unit": "milliseconds",
+            "startValue": 0, "endValue": 0, "samples": [], "weights": [],
+        })
+        p["samples"].append([frames.setdefault(f, len(frames)) for f in stack])
+        p["weights"].append(weight * 1000)
+        p["endValue"] += weight * 1000
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": title,
+        "exporter": APP_NAME,
+        "shared": {"frames": [{"name": n, "file": f, "line": line} for n, f, line in frames]},
+        "profiles": list(profiles.values()),
+    }
+
+
+def _server_timing(spans: dict, total: float) -> str:
+    parts = [f"{name};dur={spans[name] * 1000:.1f}" for name in SERVER_TIMING_SPANS if spans.get(name)]
+    return ", ".join(parts + [f"total;dur={total * 1000:.1f}"])
+
+
+class MetricsMiddleware:
+    """
+    Per-route latency into HTTP_REQUEST_SECONDS (up to the last body chunk),
+    the Server-Timing header, and ?__profile for admins.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        t0 = time.perf_counter()
+        spans: dict[str, float] = {}
+        token = _request_spans.set(spans)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(spans, time.perf_counter() - t0).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            if b"__profile" in scope.get("query_string", b""):
+                request = Request(scope)
+                mode = PROFILE_MODES.get(request.query_params.get("__profile", ""))
+                if mode and _verify_session(request.cookies.get(ADMIN_COOKIE_NAME)):
+                    return await self._profile(scope, receive, send, mode)
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_spans.reset(token)
+            # Mounts (/static) don't set scope["route"] but do extend root_path.
+            route = getattr(scope.get("route"), "path", None) or scope.get("root_path") or "other"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - t0, scope["method"], route)
+            if route in ROLLUP_PAGES and scope["method"] == "GET":
+                count_page_view(route)
+
+    async def _profile(self, scope, receive, send, mode: str) -> None:
+        status = 0
+
+        async def discard(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        sampler = _Sampler(PROFILE_INTERVAL_SECONDS)
+        t0 = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            sampler.halt.set()
+            sampler.join()
+        wall = time.perf_counter() - t0
+        title = f"{scope['method']} {scope['path']} -> {status}"
+        headers = {"Cache-Control": "no-store"}
+        if mode == "speedscope":
+            headers["Content-Disposition"] = f'attachment; filename="profile-{int(time.time())}.speedscope.json"'
+            response = Response(json.dumps(_profile_speedscope(sampler.samples, title)),
+                                media_type="application/json", headers=headers)
+        else:
+            response = HTMLResponse(_profile_html(sampler.samples, title, wall), headers=headers)
+        await response(scope, receive, send)
+
+
+# Register every route's label set now, before serve.py forks, so all workers
+# share one layout.
+for _route in app.routes:
+    HTTP_REQUEST_SECONDS.add_labels(*[(m, _route.path) for m in (getattr(_route, "methods", None) or ("GET", "HEAD"))])
+    if getattr(_route, "response_class", None) is HTMLResponse:
+        PAGE_RENDER_SECONDS.add_labels((_route.path,))
+        if "GET" in _route.methods and not _route.path.startswith("/admin"):
+            ROLLUP_PAGES.add(_route.path)
+app.add_middleware(MetricsMiddleware)
+
+
+# -----------------------------
+# In-process requests (bench.py, manage.py prerender)
+# -----------------------------
+async def _asgi_request(
+    method: str, path: str, headers: dict[str, str], request_body: bytes = b""
+) -> tuple[int, dict[str, str], bytes]:
+    raw_path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": raw_path,
+        "raw_path": raw_path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    status, out_headers, body = 0, {}, bytearray()
+    sent_request = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": request_body, "more_body": False}
+        await finished.wait()  # like a client, hang up once the body is complete
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            out_headers.update({k.decode().lower(): v.decode() for k, v in message["headers"]})
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return status, out_headers, bytes(body)
+
+
+def asgi_get(path: str, headers: dict[str, str] | None = None) -> tuple[int, dict[str, str], bytes]:
+    """One in-process GET against the app (no server, no httpx)."""
+    return asyncio.run(_asgi_request("GET", path, headers or {}))
+
+
+def asgi_post_form(path: str, form: dict[str, str], headers: dict[str, str] | None = None) -> tuple[int, dict[str, str], bytes]:
+    """One in-process urlencoded form POST against the app."""
+    body = urllib.parse.urlencode(form).encode()
+    headers = {**(headers or {}), "content-type": "application/x-www-form-urlencoded",
+               "content-length": str(len(body))}
+    return asyncio.run(_asgi_request("POST", path, headers, body))
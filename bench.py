@@ -0,0 +1,990 @@
+"""
+Micro-benchmarks for the hot paths in app.py.
+
+Run from the repo root (app.py mounts ./static at import time):
+
+    python bench.py excel-append --rows 10,1000,10000,100000
+    python bench.py db-insert --threads 16 -n 4000
+    python bench.py pages -n 2000
+    python bench.py revisit
+    python bench.py ingest-stress --workers 4 -n 4000
+    python bench.py startup --workers 4
+    python bench.py faults
+    python bench.py admin-leads --rows 1000,1000000
+    python bench.py admin-search --rows 1000,300000
+    python bench.py admin-dashboard --rows 1000,300000
+    python bench.py delta-export --rows 100000 --new 100
+    python bench.py export-api --rows 100000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import random
+import re
+import signal
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from openpyxl import Workbook, load_workbook
+
+import app
+
+
+def _pct(samples: list[float], p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def _report(label: str, samples: list[float]) -> None:
+    ms = [s * 1000 for s in samples]
+    print(
+        f"{label:<28} n={len(ms):<6} "
+        f"p50={statistics.median(ms):8.3f}ms  p99={_pct(ms, 0.99):8.3f}ms  max={max(ms):8.3f}ms"
+    )
+
+
+def _lead(i: int) -> dict:
+    return {
+        "created_at": "2026-01-01T00:00:00",
+        "name": f"Bench {i}",
+        "phone": "0400000000",
+        "email": "bench@example.com",
+        "state": "Sydney",
+        "service": "Residential painting",
+        "message": "Two bedrooms and a hallway, some patching.",
+        "ip": "127.0.0.1",
+    }
+
+
+def _seed_workbook(rows: int) -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Leads")
+    ws.append(app.EXCEL_HEADERS)
+    lead = [_lead(0).get(h, "") for h in app.EXCEL_HEADERS]
+    for _ in range(rows):
+        ws.append(lead)
+    wb.save(app.EXCEL_PATH)
+
+
+def bench_excel_append(args: argparse.Namespace) -> None:
+    """Submit latency of append_lead_to_excel against workbooks of growing size."""
+    for rows in [int(x) for x in args.rows.split(",")]:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            _seed_workbook(rows)
+            samples = []
+            for i in range(args.n):
+                t0 = time.perf_counter()
+                app.append_lead_to_excel(_lead(i))
+                samples.append(time.perf_counter() - t0)
+            _report(f"append @ {rows} rows", samples)
+
+            t0 = time.perf_counter()
+            folded = app.compact_leads_excel()
+            print(f"{'':<28} compacted {folded} rows in {(time.perf_counter() - t0) * 1000:.1f}ms (off request path)")
+
+
+def _lead_params(i: int) -> tuple:
+    return ("2026-01-01T00:00:00+00:00", f"Bench {i}", "0400000000", None, "Bondi", "Residential painting",
+            "Two bedrooms.", "/contact")
+
+
+def _insert_connect_per_request(i: int) -> None:
+    # What quote() did before the pool: fresh connection, rollback journal.
+    with sqlite3.connect(app.DB_PATH) as con:
+        con.execute(app.INSERT_LEAD_SQL, _lead_params(i))
+        con.commit()
+
+
+def _insert_pooled(i: int) -> None:
+    with app.db_connection() as con:
+        con.execute(app.INSERT_LEAD_SQL, _lead_params(i))
+        con.commit()
+
+
+def _insert_group_commit(i: int) -> None:
+    app.submit_lead(_lead_params(i)).result()
+
+
+def _run_concurrent(fn, n: int, threads: int) -> tuple[float, list[float]]:
+    def timed(i: int) -> float:
+        t0 = time.perf_counter()
+        fn(i)
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        samples = list(pool.map(timed, range(n)))
+    return time.perf_counter() - t0, samples
+
+
+def bench_db_insert(args: argparse.Namespace) -> None:
+    """Concurrent lead inserts: connect-per-request vs pooled WAL vs group commit."""
+    variants = [
+        ("connect-per-request", _insert_connect_per_request),
+        ("pooled WAL", _insert_pooled),
+        ("group commit", _insert_group_commit),
+    ]
+    for label, fn in variants:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            app.close_db_pool()
+            if fn is _insert_connect_per_request:
+                # Same schema, but left in the default rollback-journal mode.
+                with sqlite3.connect(app.DB_PATH) as con:
+                    con.execute("CREATE TABLE leads (id INTEGER PRIMARY KEY AUTOINCREMENT, created_at TEXT NOT NULL, "
+                                "name TEXT NOT NULL, phone TEXT NOT NULL, email TEXT, suburb TEXT NOT NULL, "
+                                "service TEXT NOT NULL, message TEXT NOT NULL, page TEXT)")
+            else:
+                app.init_db()
+            elapsed, samples = _run_concurrent(fn, args.n, args.threads)
+            _report(label, samples)
+            print(f"{'':<28} {args.n / elapsed:8.0f} inserts/s with {args.threads} threads")
+            app.stop_lead_writer()
+            app.close_db_pool()
+
+
+def _per_second(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn(None)
+    return n / (time.perf_counter() - t0)
+
+
+def bench_pages(args: argparse.Namespace) -> None:
+    """Handler throughput per marketing route: full render vs page-cache hit."""
+    app.warm_page_cache()
+    print(f"{'route':<24} {'render/s':>10} {'cached/s':>10} {'speedup':>8}")
+    for route in app.app.routes:
+        endpoint = getattr(route, "endpoint", None)
+        if endpoint is None or not hasattr(endpoint, "__wrapped__") or endpoint.__name__ not in app._cached_pages:
+            continue
+        before = _per_second(endpoint.__wrapped__, args.n)
+        after = _per_second(endpoint, args.n)
+        print(f"{route.path:<24} {before:10.0f} {after:10.0f} {after / before:7.1f}x")
+
+
+def bench_revisit(args: argparse.Namespace) -> None:
+    """
+    Cold visit every page plus the assets it references, then revisit with
+    the validators a browser would have kept. Fails unless the warm revisit
+    is all 304s (or immutable URLs the browser wouldn't request at all), or
+    if a wrong ?v= is served as immutable.
+    """
+    pages = ["/", "/services", "/portfolio", "/contact",
+             "/learn/residential", "/learn/commercial", "/learn/prep", "/learn/premium-finish"]
+    accept = {"accept-encoding": "br, gzip"}
+    urls = list(pages)
+    for p in pages:
+        _, _, body = app.asgi_get(p)
+        for ref in re.findall(r'(?:src|href)="(/(?:static|img|assets)/[^"]+)"', body.decode("utf-8")):
+            if ref not in urls:
+                urls.append(ref)
+
+    cold_bytes = 0
+    validators: dict[str, dict[str, str]] = {}
+    for url in urls:
+        status, headers, body = app.asgi_get(url, accept)
+        assert status == 200, (url, status)
+        cold_bytes += len(body)
+        validators[url] = headers
+
+    warm_bytes, skipped, failures = 0, 0, []
+    for url in urls:
+        cached = validators[url]
+        if "immutable" in cached.get("cache-control", ""):
+            skipped += 1
+            continue
+        conditional = dict(accept)
+        if "etag" in cached:
+            conditional["if-none-match"] = cached["etag"]
+        if "last-modified" in cached:
+            conditional["if-modified-since"] = cached["last-modified"]
+        status, _, body = app.asgi_get(url, conditional)
+        warm_bytes += len(body)
+        if status != 304:
+            failures.append(f"{url} -> {status}")
+
+    # A stale or guessed fingerprint must not be cached as immutable.
+    for url in urls:
+        if url.startswith("/static/") and "?v=" in url:
+            _, headers, _ = app.asgi_get(url.partition("?")[0] + "?v=0000000000", accept)
+            if "immutable" in headers.get("cache-control", ""):
+                failures.append(f"{url} with a wrong ?v= -> immutable")
+
+    print(f"{len(urls)} urls: cold {cold_bytes / 1024:.1f} KiB, warm {warm_bytes} B "
+          f"({len(urls) - skipped} revalidated, {skipped} immutable)")
+    if failures:
+        raise SystemExit("warm revisit re-downloaded:\n  " + "\n  ".join(failures))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _post_quote(base: str, i: int) -> int:
+    form = urllib.parse.urlencode({
+        "name": f"Stress {i}",
+        "phone": "0400000000",
+        "suburb": "Bondi",
+        "service": "Residential painting",
+        "message": "Two bedrooms and a hallway.",
+        "page": "/contact",
+    }).encode()
+    for _ in range(50):
+        try:
+            with urllib.request.urlopen(base + "/api/quote", data=form, timeout=30) as resp:
+                return resp.status
+        except urllib.error.HTTPError as e:
+            if e.code != 503:
+                return e.code
+            time.sleep(float(e.headers.get("Retry-After", "1")) / 10)  # shed: back off and resubmit
+    return 503
+
+
+def bench_ingest_stress(args: argparse.Namespace) -> None:
+    """
+    Runs `uvicorn --workers N` on a scratch directory, fires -n concurrent
+    quote submissions at it, stops it (each worker flushes its journal on
+    shutdown), then checks every accepted lead is in SQLite and leads.xlsx
+    exactly once.
+    """
+    repo = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        os.symlink(os.path.join(repo, "static"), os.path.join(tmp, "static"))
+        port = _free_port()
+        env = dict(os.environ, EXCEL_COMPACT_INTERVAL_SECONDS=str(args.compact_interval))
+        log = open(os.path.join(tmp, "server.log"), "w+")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app:app", "--app-dir", repo,
+             "--port", str(port), "--workers", str(args.workers), "--log-level", "warning"],
+            cwd=tmp, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        base = f"http://127.0.0.1:{port}"
+        try:
+            for _ in range(100):
+                try:
+                    urllib.request.urlopen(base + "/robots.txt", timeout=1).close()
+                    break
+                except OSError:
+                    time.sleep(0.2)
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                statuses = list(pool.map(lambda i: _post_quote(base, i), range(args.n)))
+            elapsed = time.perf_counter() - t0
+        finally:
+            server.send_signal(signal.SIGINT)
+            server.wait(timeout=60)
+            log.seek(0)
+            errors = log.read().count("Traceback")
+            log.close()
+
+        accepted = {f"Stress {i}" for i, status in enumerate(statuses) if status == 200}
+        with sqlite3.connect(os.path.join(tmp, app.DB_PATH)) as con:
+            db_names = [r[0] for r in con.execute("SELECT name FROM leads")]
+        ws = load_workbook(os.path.join(tmp, app.EXCEL_PATH), read_only=True)["Leads"]
+        xlsx_names = [row[1] for row in ws.iter_rows(min_row=2, values_only=True)]
+        leftover = [p for p in (app.LEADS_JOURNAL_PATH, app.LEADS_JOURNAL_PATH + ".folding")
+                    if os.path.exists(os.path.join(tmp, p)) and os.path.getsize(os.path.join(tmp, p))]
+
+    print(f"{args.n} submissions, {args.workers} workers, {args.concurrency} clients: "
+          f"{len(accepted)} accepted in {elapsed:.1f}s ({len(accepted) / elapsed:.0f}/s)")
+    print(f"sqlite rows {len(db_names)} ({len(set(db_names))} distinct), "
+          f"xlsx rows {len(xlsx_names)} ({len(set(xlsx_names))} distinct)")
+    problems = []
+    if len(accepted) != args.n:
+        problems.append(f"{args.n - len(accepted)} submissions never accepted: "
+                        f"{sorted(set(statuses) - {200})}")
+    for label, names in (("sqlite", db_names), ("xlsx", xlsx_names)):
+        if set(names) != accepted:
+            problems.append(f"{label}: {len(accepted - set(names))} lost, {len(set(names) - accepted)} unexpected")
+        if len(names) != len(set(names)):
+            problems.append(f"{label}: {len(names) - len(set(names))} duplicated")
+    if errors:
+        problems.append(f"{errors} tracebacks in the server log (compaction/shutdown errors)")
+    if leftover:
+        problems.append(f"unflushed journal files: {leftover}")
+    if problems:
+        raise SystemExit("ingest stress failed:\n  " + "\n  ".join(problems))
+
+
+PAGES = ["/", "/services", "/portfolio", "/contact",
+         "/learn/residential", "/learn/commercial", "/learn/prep", "/learn/premium-finish"]
+
+
+def _children(pid: int) -> list[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def _memory_kib(pid: int) -> dict[str, int]:
+    # Rss counts shared pages in full; Pss splits them between the processes
+    # sharing them; Private_* is what this worker costs on its own.
+    out = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                out[key] = int(rest.split()[0])
+    out["Private"] = out.pop("Private_Clean", 0) + out.pop("Private_Dirty", 0)
+    return out
+
+
+def _startup_run(cmd: list[str], port: int, workers: int, rounds: int) -> None:
+    repo = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        os.symlink(os.path.join(repo, "static"), os.path.join(tmp, "static"))
+        base = f"http://127.0.0.1:{port}"
+        env = dict(os.environ, PYTHONPATH=repo)
+        t0 = time.perf_counter()
+        server = subprocess.Popen(cmd, cwd=tmp, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while True:
+                try:
+                    urllib.request.urlopen(base + "/robots.txt", timeout=1).close()
+                    break
+                except OSError:
+                    if time.perf_counter() - t0 > 60:
+                        raise SystemExit(f"{cmd[0]} did not come up")
+                    time.sleep(0.02)
+            ready = time.perf_counter() - t0
+            pids = []
+            while len(pids) < workers:
+                pids = [p for p in _children(server.pid)
+                        if "resource_tracker" not in open(f"/proc/{p}/cmdline").read()]
+                time.sleep(0.05)
+            time.sleep(1)  # let the other workers finish their lifespan startup
+
+            # First requests after boot, one connection each so they spread over
+            # the workers: what the first visitors after a deploy/recycle see.
+            samples = []
+            for _ in range(rounds):
+                for path in PAGES:
+                    t1 = time.perf_counter()
+                    urllib.request.urlopen(base + path, timeout=10).read()
+                    samples.append(time.perf_counter() - t1)
+            mem = [_memory_kib(p) for p in pids]
+        finally:
+            server.send_signal(signal.SIGINT)
+            server.wait(timeout=30)
+
+    label = os.path.basename(cmd[1] if cmd[1] != "-m" else cmd[2])
+    print(f"{label}: first 200 after {ready * 1000:.0f}ms, {len(pids)} workers")
+    _report("  cold page requests", samples)
+    for key in ("Rss", "Pss", "Private"):
+        vals = [m[key] / 1024 for m in mem]
+        print(f"  {key + ' per worker':<26} avg {statistics.mean(vals):7.1f} MiB  (total {sum(vals):7.1f} MiB)")
+
+
+def bench_startup(args: argparse.Namespace) -> None:
+    """
+    Boots `uvicorn --workers N` and `serve.py --workers N` in turn, then
+    reports time to first response, latency of the first page requests and
+    per-worker memory (Rss / Pss / Private from /proc/<pid>/smaps_rollup).
+    """
+    repo = os.path.dirname(os.path.abspath(__file__))
+    n = str(args.workers)
+    port = _free_port()
+    _startup_run([sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--workers", n,
+                  "--log-level", "warning"], port, args.workers, args.rounds)
+    port = _free_port()
+    _startup_run([sys.executable, os.path.join(repo, "serve.py"), "--host", "127.0.0.1", "--port", str(port),
+                  "--workers", n, "--log-level", "warning"], port, args.workers, args.rounds)
+
+
+BENCH_SERVICES = ["Residential painting", "Commercial painting", "Surface prep", "Premium finish"]
+BENCH_SUBURBS = [
+    "Bondi", "Manly", "Parramatta", "Chatswood", "Newtown", "Penrith", "Cronulla", "Hornsby", "Liverpool", "Ryde",
+    "Epping", "Strathfield", "Burwood", "Marrickville", "Randwick", "Coogee", "Mosman", "Castle Hill", "Blacktown",
+    "Bankstown", "Hurstville", "Kogarah", "Miranda", "Sutherland", "Camden", "Campbelltown", "Dee Why", "Brookvale",
+    "Lane Cove", "Artarmon", "Willoughby", "Neutral Bay", "Balmain", "Rozelle", "Leichhardt", "Ashfield", "Concord",
+    "Drummoyne", "Gladesville", "Eastwood", "Carlingford", "Baulkham Hills", "Kellyville", "Rouse Hill", "Windsor",
+    "Richmond", "Glenbrook", "Springwood", "Katoomba", "Paddington",
+]
+BENCH_FORM_PAGES = ["/", "/contact"]
+BENCH_FIRST = ["Olivia", "Jack", "Amelia", "Noah", "Isla", "Oliver", "Mia", "William", "Ava", "Leo", "Grace", "Henry"]
+BENCH_LAST = ["Smith", "Jones", "Williams", "Brown", "Wilson", "Taylor", "Nguyen", "Johnson", "Martin", "White", "Kelly"]
+BENCH_JOBS = [
+    "Two bedrooms and a hallway, some patching.",
+    "Feature wall in the lounge, dark navy.",
+    "Exterior weatherboards peeling on the north side.",
+    "Office fit-out, 400 square metres, after hours only.",
+    "Ceilings water stained after a leak, need sealing first.",
+    "Timber deck and balustrade, oil or stain.",
+    "Kitchen cabinets respray in satin white.",
+]
+
+
+def _seed_leads(rows: int) -> None:
+    """`rows` leads, one a minute up to now, through the real schema, migrations and triggers."""
+    app.init_db()
+    start = datetime.now(timezone.utc).replace(second=0, microsecond=0) - timedelta(minutes=rows)
+    with app.db_connection() as con:
+        for lo in range(0, rows, 50_000):
+            con.executemany(app.INSERT_LEAD_SQL, (
+                ((start + timedelta(minutes=i)).isoformat(),
+                 f"{BENCH_FIRST[i % len(BENCH_FIRST)]} {BENCH_LAST[i % len(BENCH_LAST)]}",
+                 f"04{i * 7919 % 10**8:02d} {i % 1000:03d} {i * 31 % 1000:03d}", None,
+                 BENCH_SUBURBS[i % len(BENCH_SUBURBS)], BENCH_SERVICES[i % len(BENCH_SERVICES)],
+                 f"{BENCH_JOBS[i % len(BENCH_JOBS)]} Ref {i}.", BENCH_FORM_PAGES[i % len(BENCH_FORM_PAGES)])
+                for i in range(lo, min(rows, lo + 50_000))
+            ))
+            con.commit()
+
+
+def bench_admin_leads(args: argparse.Namespace) -> None:
+    """
+    /admin/leads latency vs table size: first page, deep pages via random
+    cursors, and each filter. Keyset pagination should keep p95 flat from
+    1k to 1M rows; fails if any p95 is over --p95-ms.
+    """
+    cookie = {"cookie": f"{app.ADMIN_COOKIE_NAME}={app._make_session('admin')}"}
+    rng = random.Random(0)
+    failures = []
+    for rows in (int(r) for r in args.rows.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            app.close_db_pool()
+            t0 = time.perf_counter()
+            _seed_leads(rows)
+            print(f"{rows} rows seeded in {time.perf_counter() - t0:.1f}s")
+            with app.db_connection() as con:
+                keys = con.execute("SELECT created_at, id FROM leads").fetchall()
+            day = lambda i: keys[i][0][:10]
+            cases = {
+                "first page": lambda: "/admin/leads",
+                "deep page": lambda: "/admin/leads?before=" + app._lead_cursor(*rng.choice(keys)),
+                "newer page": lambda: "/admin/leads?after=" + app._lead_cursor(*rng.choice(keys)),
+                "service": lambda: "/admin/leads?" + urllib.parse.urlencode(
+                    {"service": rng.choice(BENCH_SERVICES), "before": app._lead_cursor(*rng.choice(keys))}),
+                "suburb": lambda: "/admin/leads?" + urllib.parse.urlencode(
+                    {"suburb": rng.choice(BENCH_SUBURBS).upper(), "before": app._lead_cursor(*rng.choice(keys))}),
+                "date range": lambda: "/admin/leads?" + urllib.parse.urlencode(
+                    {"since": day(rng.randrange(len(keys))), "until": day(rng.randrange(len(keys)))}),
+            }
+            for label, make in cases.items():
+                samples = []
+                for _ in range(args.n):
+                    url = make()
+                    t0 = time.perf_counter()
+                    status, _, _ = app.asgi_get(url, cookie)
+                    samples.append(time.perf_counter() - t0)
+                    assert status == 200, (url, status)
+                _report(f"{rows} {label}", samples)
+                p95 = _pct(samples, 0.95) * 1000
+                if p95 > args.p95_ms:
+                    failures.append(f"{rows} rows, {label}: p95 {p95:.1f}ms")
+            if args.explain:
+                where, params = app._lead_filters(service=BENCH_SERVICES[0])
+                with app.db_connection() as con:
+                    plan = con.execute(
+                        f"EXPLAIN QUERY PLAN SELECT * FROM leads{where} AND (created_at, id) < (?, ?) "
+                        "ORDER BY created_at DESC, id DESC LIMIT 51", params + list(keys[-1]),
+                    ).fetchall()
+                print("  " + "\n  ".join(row[-1] for row in plan))
+            app.close_db_pool()
+    if failures:
+        raise SystemExit(f"p95 over {args.p95_ms}ms:\n  " + "\n  ".join(failures))
+
+
+def _name_and_ref(i: int) -> str:
+    """A partial first name plus the ref number, as an admin would type it for lead i."""
+    return f"{BENCH_FIRST[i % len(BENCH_FIRST)][:3]} ref {i}"
+
+
+def bench_admin_search(args: argparse.Namespace) -> None:
+    """
+    /admin/search latency vs table size, from a rare exact match (one
+    phone, one name + ref) to terms that hit a large share of the table.
+    Fails if any p95 is over --p95-ms.
+    """
+    cookie = {"cookie": f"{app.ADMIN_COOKIE_NAME}={app._make_session('admin')}"}
+    rng = random.Random(0)
+    failures = []
+    for rows in (int(r) for r in args.rows.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            app.close_db_pool()
+            t0 = time.perf_counter()
+            _seed_leads(rows)
+            print(f"{rows} rows seeded and indexed in {time.perf_counter() - t0:.1f}s")
+            with app.db_connection() as con:
+                phones = [p for (p,) in con.execute("SELECT phone FROM leads ORDER BY random() LIMIT 1000")]
+            cases = {
+                "phone prefix": lambda: rng.choice(phones)[:7],
+                "intl phone": lambda: "+61 " + rng.choice(phones)[1:9],
+                "name + ref": lambda: _name_and_ref(rng.randrange(rows)),
+                "phrase": lambda: '"feature wall" ' + rng.choice(BENCH_SUBURBS),
+                "common word": lambda: rng.choice(["hallway", "navy", "deck", "kitchen"]),
+            }
+            for label, make in cases.items():
+                samples, hits = [], 0
+                for _ in range(args.n):
+                    url = "/admin/search?" + urllib.parse.urlencode({"q": make()})
+                    t0 = time.perf_counter()
+                    status, _, body = app.asgi_get(url, cookie)
+                    samples.append(time.perf_counter() - t0)
+                    assert status == 200, (url, status)
+                    hits += b"<mark>" in body
+                _report(f"{rows} {label}", samples)
+                assert hits == args.n, f"{label}: {args.n - hits} searches found nothing"
+                p95 = _pct(samples, 0.95) * 1000
+                if p95 > args.p95_ms:
+                    failures.append(f"{rows} rows, {label}: p95 {p95:.1f}ms")
+            app.close_db_pool()
+    if failures:
+        raise SystemExit(f"p95 over {args.p95_ms}ms:\n  " + "\n  ".join(failures))
+
+
+def bench_admin_dashboard(args: argparse.Namespace) -> None:
+    """
+    /admin/dashboard latency vs table size, next to the GROUP BY over leads
+    it replaces. The dashboard reads only the rollups, so it should stay flat.
+    """
+    cookie = {"cookie": f"{app.ADMIN_COOKIE_NAME}={app._make_session('admin')}"}
+    failures = []
+    for rows in (int(r) for r in args.rows.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            app.close_db_pool()
+            t0 = time.perf_counter()
+            _seed_leads(rows)
+            print(f"{rows} rows seeded, rollups maintained by triggers, in {time.perf_counter() - t0:.1f}s")
+            for period in app.DASHBOARD_BUCKETS:
+                samples = []
+                for _ in range(args.n):
+                    t0 = time.perf_counter()
+                    status, _, _ = app.asgi_get(f"/admin/dashboard?period={period}", cookie)
+                    samples.append(time.perf_counter() - t0)
+                    assert status == 200, status
+                _report(f"{rows} dashboard {period}", samples)
+                p95 = _pct(samples, 0.95) * 1000
+                if p95 > args.p95_ms:
+                    failures.append(f"{rows} rows, {period}: p95 {p95:.1f}ms")
+            with app.db_connection() as con:
+                t0 = time.perf_counter()
+                for dimension in app.ROLLUP_DIMENSIONS:
+                    con.execute(f"SELECT substr(created_at, 1, 10), {dimension}, count(*) FROM leads "
+                                f"GROUP BY 1, 2").fetchall()
+                print(f"{'':<28} GROUP BY over leads instead: {(time.perf_counter() - t0) * 1000:.1f}ms")
+            app.close_db_pool()
+    if failures:
+        raise SystemExit(f"p95 over {args.p95_ms}ms:\n  " + "\n  ".join(failures))
+
+
+def bench_delta_export(args: argparse.Namespace) -> None:
+    """
+    A "what's new" pull after --new fresh leads, as the full xlsx export
+    admins used to download vs /admin/leads/delta in each format.
+    """
+    cookie = {"cookie": f"{app.ADMIN_COOKIE_NAME}={app._make_session('admin')}"}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        app.close_db_pool()
+        _seed_leads(args.rows)
+        status, headers, _ = app.asgi_get("/admin/leads/delta?format=ndjson", cookie)  # catch the cursor up
+        assert status == 200 and headers["x-lead-count"] == str(args.rows), headers
+        with app.db_connection() as con:
+            con.executemany(app.INSERT_LEAD_SQL, (_lead_params(i) for i in range(args.new)))
+            con.commit()
+        cursor = headers["x-lead-cursor"]
+
+        def pull(url: str) -> None:
+            t0 = time.perf_counter()
+            status, headers, body = app.asgi_get(url, cookie)
+            elapsed = (time.perf_counter() - t0) * 1000
+            assert status == 200, (url, status)
+            rows = headers.get("x-lead-count", args.rows + args.new)
+            print(f"{url:<52} {elapsed:9.1f}ms {len(body) / 1024:10.1f} KiB  {rows} rows")
+
+        pull("/admin/leads.xlsx?source=db")
+        for fmt in app.LEAD_EXPORT_FORMATS:
+            pull(f"/admin/leads/delta?format={fmt}&after_id={cursor}")
+        app.close_db_pool()
+
+
+def _heap_peak_kib(chunks) -> tuple[int, int]:
+    """Drains a response body generator; returns (bytes, peak traced heap KiB) while it ran."""
+    tracemalloc.start()
+    size = sum(len(chunk) for chunk in chunks)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, peak // 1024
+
+
+def bench_export_api(args: argparse.Namespace) -> None:
+    """
+    /api/leads/export (NDJSON/CSV, optionally gzip'd) vs the xlsx download a
+    sync job parsed with openpyxl before: wall time, bytes, and the server's
+    peak heap while producing the body. Then --partitions id ranges fetched
+    in parallel must add up to the full export exactly.
+    """
+    token = {"authorization": f"Bearer {app._make_export_token('bench', 3600)}"}
+    cookie = {"cookie": f"{app.ADMIN_COOKIE_NAME}={app._make_session('admin')}"}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        app.close_db_pool()
+        _seed_leads(args.rows)
+        print(f"{args.rows} leads")
+
+        t0 = time.perf_counter()
+        _, _, body = app.asgi_get("/admin/leads.xlsx?source=db", cookie)
+        rows = sum(1 for _ in load_workbook(io.BytesIO(body), read_only=True).active.iter_rows(values_only=True)) - 1
+        print(f"{'xlsx + openpyxl parse':<24} {time.perf_counter() - t0:7.2f}s {len(body) / 2**20:8.1f} MiB  "
+              f"{'':<27}({rows} rows)")
+
+        for fmt in app.EXPORT_API_FORMATS:
+            for compress in (False, True):
+                headers = {**token, "accept-encoding": "gzip"} if compress else token
+                t0 = time.perf_counter()
+                _, _, body = app.asgi_get(f"/api/leads/export?format={fmt}", headers)
+                text = (gzip.decompress(body) if compress else body).decode("utf-8")
+                rows = (sum(1 for _ in csv.reader(io.StringIO(text))) - 1 if fmt == "csv"
+                        else sum(1 for line in text.splitlines() if json.loads(line)))
+                elapsed = time.perf_counter() - t0
+                stream, _ = app.LEAD_EXPORT_FORMATS[fmt]
+                _, peak = _heap_peak_kib(app._export_body(stream, "", [], compress))
+                label = f"{fmt}{' + gzip' if compress else ''} + parse"
+                print(f"{label:<24} {elapsed:7.2f}s {len(body) / 2**20:8.1f} MiB  "
+                      f"server heap peak {peak / 1024:7.1f} MiB  ({rows} rows)")
+
+        # An empty probe past the end still reports the current top id to split on.
+        _, headers, _ = app.asgi_get(f"/api/leads/export?after_id={2**62}", token)
+        top = int(headers["x-lead-max-id"])
+        bounds = [top * k // args.partitions for k in range(args.partitions + 1)]
+
+        def part(k: int) -> list[int]:
+            url = f"/api/leads/export?after_id={bounds[k]}&max_id={bounds[k + 1]}"
+            return [json.loads(line)["id"] for line in app.asgi_get(url, token)[2].splitlines()]
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.partitions) as pool:
+            ids = [i for chunk in pool.map(part, range(args.partitions)) for i in chunk]
+        assert sorted(ids) == list(range(1, top + 1)), "partitions overlap or miss rows"
+        print(f"{args.partitions} id partitions in parallel: {time.perf_counter() - t0:.2f}s, "
+              f"{len(ids)} rows, no gaps or overlap")
+        app.close_db_pool()
+
+
+def _fault_control_char_quote() -> None:
+    """A quote whose message holds a control character still compacts, and doesn't block later leads."""
+    form = {"name": "Ctrl", "phone": "0400000000", "suburb": "Bondi", "service": "Residential painting",
+            "message": "bell \x07 and \x01 in here", "page": "/contact"}
+    status, _, _ = app.asgi_post_form("/api/quote", form)
+    assert status == 200, status
+    assert app.compact_leads_excel() == 1
+    status, _, _ = app.asgi_post_form("/api/quote", {**form, "message": "a normal message"})
+    assert status == 200 and app.compact_leads_excel() == 1
+    messages = [row[6] for row in load_workbook(app.EXCEL_PATH).active.iter_rows(min_row=2, values_only=True)]
+    assert messages == ["bell \\x07 and \\x01 in here", "a normal message"], messages
+
+
+def _fault_crash_mid_swap() -> None:
+    """A compaction killed around the workbook swap neither loses nor duplicates its batch."""
+    real_replace, real_remove = os.replace, os.remove
+
+    def crash_on(fn, target):
+        def patched(src, *rest):
+            if (rest[0] if rest else src).startswith(target):
+                raise SystemExit("simulated crash")
+            return fn(src, *rest)
+        return patched
+
+    # Killed just before leads.xlsx.tmp is swapped in; then killed after the
+    # swap, before the journal batch file is cleaned up.
+    for fn_name, patched in (("replace", crash_on(real_replace, app.EXCEL_PATH)),
+                             ("remove", crash_on(real_remove, app.LEADS_JOURNAL_PATH))):
+        before = load_workbook(app.EXCEL_PATH).active.max_row if os.path.exists(app.EXCEL_PATH) else 1
+        app.append_lead_to_excel(_lead(0))
+        setattr(app.os, fn_name, patched)
+        try:
+            app.compact_leads_excel()
+        except SystemExit:
+            pass
+        finally:
+            app.os.replace, app.os.remove = real_replace, real_remove
+        app.compact_leads_excel()  # the next run recovers
+        rows = load_workbook(app.EXCEL_PATH).active.max_row
+        assert rows == before + 1, f"crash in os.{fn_name}: {rows - before} rows for one lead"
+        assert not any(os.path.exists(app.LEADS_JOURNAL_PATH + ext) for ext in (".folding", ".folded"))
+
+
+def _fault_control_char_db_export() -> None:
+    """A stored lead with a control character doesn't break the DB-backed leads.xlsx export."""
+    cookie = {"cookie": f"{app.ADMIN_COOKIE_NAME}={app._make_session('admin')}"}
+    with app.db_connection() as con:
+        con.execute(app.INSERT_LEAD_SQL, (*_lead_params(0)[:6], "form feed \x0c here", "/"))
+        con.execute(app.INSERT_LEAD_SQL, _lead_params(1))
+        con.commit()
+    for url in ("/admin/leads.xlsx?source=db", "/admin/leads.xlsx?service=Residential+painting"):
+        status, _, body = app.asgi_get(url, cookie)
+        assert status == 200, (url, status)
+        messages = [row[7] for row in load_workbook(io.BytesIO(body)).active.iter_rows(min_row=2, values_only=True)]
+        assert messages == ["form feed \\x0c here", "Two bedrooms."], messages
+
+
+def _fault_writer_batches() -> None:
+    """A cancelled Future or one bad row in a group commit only affects that submitter."""
+    from concurrent.futures import Future
+
+    batch = [(_lead_params(i), Future()) for i in range(4)]
+    batch[2] = ((*_lead_params(2)[:1], None, *_lead_params(2)[2:]), batch[2][1])  # name NOT NULL
+    batch[0][1].cancel()
+    app._commit_lead_batch(batch)
+    cancelled, ok1, bad, ok2 = (fut for _, fut in batch)
+    assert cancelled.cancelled()
+    assert isinstance(bad.exception(timeout=0), sqlite3.IntegrityError), bad.exception(timeout=0)
+    assert ok1.result(timeout=0) and ok2.result(timeout=0)
+    with app.db_connection() as con:
+        assert con.execute("SELECT count(*) FROM leads").fetchone()[0] == 2
+
+    # The writer thread outlives a batch that blows up, and keeps serving.
+    real = app._commit_lead_batch
+    app._commit_lead_batch = lambda batch: (setattr(app, "_commit_lead_batch", real), 1 / 0)
+    doomed = app.submit_lead(_lead_params(4))
+    assert isinstance(doomed.exception(timeout=5), ZeroDivisionError)
+    assert app.submit_lead(_lead_params(5)).result(timeout=5)
+
+
+def _fault_quote_client_gone() -> None:
+    """A client hanging up while its quote is committing still gets the lead journaled."""
+    form = {"name": "Gone", "phone": "0400000000", "suburb": "Manly", "service": "Residential painting",
+            "message": "hung up mid-save", "page": "/contact"}
+    body = urllib.parse.urlencode(form).encode()
+    headers = {"content-type": "application/x-www-form-urlencoded", "content-length": str(len(body))}
+    real = app._insert_leads
+
+    def slow_insert(batch):
+        time.sleep(0.2)
+        return real(batch)
+
+    async def hang_up():
+        request = asyncio.create_task(app._asgi_request("POST", "/api/quote", headers, body))
+        await asyncio.sleep(0.05)  # the row is queued and the writer is mid-commit
+        request.cancel()
+        await asyncio.gather(request, return_exceptions=True)
+        await asyncio.gather(*app._persist_tasks)
+
+    app._insert_leads = slow_insert
+    try:
+        asyncio.run(hang_up())
+    finally:
+        app._insert_leads = real
+    assert app.compact_leads_excel() == 1
+
+
+def _fault_tampered_vendor_js() -> None:
+    """A vendored script that doesn't match its SRI pin is left out for the pinned CDN tag."""
+    import base64
+    import hashlib
+
+    good = b"window.htmx = {};"
+    pin = "sha384-" + base64.b64encode(hashlib.sha384(good).digest()).decode("ascii")
+    needs, _, url, _ = real = app.VENDOR_JS["htmx"]
+    app.VENDOR_JS["htmx"] = (needs, "htmx.min.js", url, pin)
+    try:
+        for body, vendored in ((good, True), (b"window.htmx = {}; steal();", False)):
+            with open("htmx.min.js", "wb") as f:
+                f.write(body)
+            os.utime("htmx.min.js", ns=(len(body), len(body)))  # distinct mtimes, no cache hit
+            tags = app.page_scripts('<form hx-post="/api/quote">')
+            cdn_tag = f'<script src="{url}" integrity="{pin}" crossorigin="anonymous" defer></script>'
+            assert (cdn_tag not in tags) == vendored, tags
+    finally:
+        app.VENDOR_JS["htmx"] = real
+
+
+def _fault_profile_param() -> None:
+    """?__profile only profiles for a signed-in admin with an explicit mode; ?__profile=0 is a normal page."""
+    admin = {"cookie": f"{app.ADMIN_COOKIE_NAME}={app._make_session(app.ADMIN_USER)}"}
+    for query, headers, profiled in (("1", admin, True), ("speedscope", admin, True), ("0", admin, False),
+                                     ("false", admin, False), ("1", {}, False)):
+        _, _, body = app.asgi_get(f"/services?__profile={query}", headers)
+        is_profile = body.startswith(b"<!doctype html><meta charset=\"utf-8\"><title>Profile:") or b"speedscope" in body[:80]
+        assert is_profile == profiled, (query, headers, body[:80])
+
+
+def _fault_delta_stream_fails() -> None:
+    """A delta download that dies partway leaves the stored cursor where it was."""
+    admin = {"cookie": f"{app.ADMIN_COOKIE_NAME}={app._make_session(app.ADMIN_USER)}"}
+    ids = [app.submit_lead(_lead_params(i)).result(timeout=5) for i in range(3)]
+    before = app._export_cursor(app.ADMIN_USER)
+    real = app.LEAD_EXPORT_FORMATS["csv"]
+
+    def dies_partway(where, params, con=None):
+        yield b"id,created_at\r\n"
+        raise OSError("simulated failure mid-stream")
+
+    app.LEAD_EXPORT_FORMATS["csv"] = (dies_partway, real[1])
+    try:
+        app.asgi_get("/admin/leads/delta?format=csv", admin)
+    except OSError:
+        pass
+    else:
+        raise AssertionError("the failing stream didn't fail")
+    finally:
+        app.LEAD_EXPORT_FORMATS["csv"] = real
+    assert app._export_cursor(app.ADMIN_USER) == before, app._export_cursor(app.ADMIN_USER)
+
+    status, headers, body = app.asgi_get("/admin/leads/delta?format=csv", admin)
+    assert status == 200 and body.count(b"\n") == 1 + len(ids), (status, body)
+    assert app._export_cursor(app.ADMIN_USER) == int(headers["x-lead-cursor"]) == max(ids)
+
+    # format=xlsx shares stream_leads_xlsx's cell cleaning.
+    params = _lead_params(3)
+    app.submit_lead((*params[:6], "ctrl \x01 char", *params[7:])).result(timeout=5)
+    status, _, body = app.asgi_get("/admin/leads/delta?format=xlsx", admin)
+    rows = list(load_workbook(io.BytesIO(body)).active.iter_rows(min_row=2, values_only=True))
+    assert status == 200 and len(rows) == 1 and "ctrl \\x01 char" in rows[0], rows
+
+
+def _fault_asset_stems() -> None:
+    """/assets only builds bundles page_scripts() could emit, and checks the digest before compressing."""
+    _, _, body = app.asgi_get("/")
+    url = re.search(r'src="(/assets/[^"]+\.js)"', body.decode("utf-8")).group(1)
+    stem = url.split("/")[-1].split(".")[0]
+    first, *rest = stem.split("-")
+    before = app._bundle.cache_info()
+    t0 = time.perf_counter()
+    for bogus in ("-".join(["tilt", "modal"] * 1500), f"{first}-{stem}", "-".join([*rest, first]),
+                  f"{stem}-nope", stem):  # huge, repeated, out of order, unknown, right stem wrong digest
+        status, _, _ = app.asgi_get(f"/assets/{bogus}.0000000000.js")
+        assert status == 404, (bogus[:40], status)
+    elapsed = time.perf_counter() - t0
+    after = app._bundle.cache_info()
+    assert (after.hits, after.misses) == (before.hits, before.misses), (before, after)
+    assert elapsed < 0.5, f"{elapsed:.2f}s to reject bad stems"
+    assert app.asgi_get(url)[0] == 200
+
+
+def _fault_rollup_week_edge() -> None:
+    """A lead in the last half-millisecond of a Sunday counts in that Sunday's week, like its day."""
+    params = _lead_params(0)
+    app.submit_lead(("2026-10-18T23:59:59.999999+00:00", *params[1:])).result(timeout=5)
+    with app.db_connection() as con:
+        buckets = dict(con.execute(
+            "SELECT period, bucket FROM lead_rollups WHERE dimension = 'service' AND leads > 0"
+        ).fetchall())
+    assert buckets == {"day": "2026-10-18", "week": "2026-10-12", "month": "2026-10-01"}, buckets
+
+
+FAULT_CHECKS = [_fault_control_char_quote, _fault_crash_mid_swap, _fault_control_char_db_export,
+                _fault_writer_batches, _fault_quote_client_gone, _fault_tampered_vendor_js,
+                _fault_profile_param, _fault_delta_stream_fails, _fault_asset_stems,
+                _fault_rollup_week_edge]
+
+
+def bench_faults(args: argparse.Namespace) -> None:
+    """Regression checks for ingest/export failure modes; each runs in a fresh directory."""
+    for check in FAULT_CHECKS:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            os.symlink(os.path.join(args.root, "static"), "static")
+            app.close_db_pool()
+            app.init_db()
+            try:
+                check()
+            finally:
+                app.stop_lead_writer()
+                app.close_db_pool()
+        print(f"ok  {check.__doc__.strip()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("excel-append", help="lead submit latency vs leads.xlsx size")
+    p.add_argument("--rows", default="10,1000,10000,100000")
+    p.add_argument("-n", type=int, default=500)
+    p.set_defaults(fn=bench_excel_append)
+
+    p = sub.add_parser("db-insert", help="lead insert throughput: per-request, pooled, group commit")
+    p.add_argument("--threads", type=int, default=16)
+    p.add_argument("-n", type=int, default=4000)
+    p.set_defaults(fn=bench_db_insert)
+
+    p = sub.add_parser("pages", help="marketing page handlers, uncached vs cached")
+    p.add_argument("-n", type=int, default=2000)
+    p.set_defaults(fn=bench_pages)
+
+    p = sub.add_parser("revisit", help="assert a warm revisit is all 304s")
+    p.set_defaults(fn=bench_revisit)
+
+    p = sub.add_parser("ingest-stress", help="multi-worker uvicorn: no lost or duplicated leads")
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--concurrency", type=int, default=64)
+    p.add_argument("-n", type=int, default=4000)
+    p.add_argument("--compact-interval", type=float, default=0.2,
+                   help="EXCEL_COMPACT_INTERVAL_SECONDS for the server, short to force overlap")
+    p.set_defaults(fn=bench_ingest_stress)
+
+    p = sub.add_parser("startup", help="uvicorn --workers vs the pre-fork launcher: boot, cold latency, memory")
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--rounds", type=int, default=3, help="passes over every page after boot")
+    p.set_defaults(fn=bench_startup)
+
+    p = sub.add_parser("faults", help="regression checks: bad rows, crashes mid-compaction, failed exports")
+    p.set_defaults(fn=bench_faults, root=os.getcwd())
+
+    p = sub.add_parser("admin-leads", help="/admin/leads keyset pagination latency vs table size")
+    p.add_argument("--rows", default="1000,1000000")
+    p.add_argument("-n", type=int, default=200, help="requests per case")
+    p.add_argument("--p95-ms", type=float, default=50.0)
+    p.add_argument("--explain", action="store_true", help="print the filtered page's query plan")
+    p.set_defaults(fn=bench_admin_leads)
+
+    p = sub.add_parser("admin-search", help="/admin/search full-text latency vs table size")
+    p.add_argument("--rows", default="1000,300000")
+    p.add_argument("-n", type=int, default=100, help="searches per case")
+    p.add_argument("--p95-ms", type=float, default=50.0)
+    p.set_defaults(fn=bench_admin_search)
+
+    p = sub.add_parser("admin-dashboard", help="/admin/dashboard (rollups only) latency vs table size")
+    p.add_argument("--rows", default="1000,300000")
+    p.add_argument("-n", type=int, default=100, help="requests per period")
+    p.add_argument("--p95-ms", type=float, default=50.0)
+    p.set_defaults(fn=bench_admin_dashboard)
+
+    p = sub.add_parser("delta-export", help="full leads.xlsx vs /admin/leads/delta after a few new leads")
+    p.add_argument("--rows", type=int, default=100000, help="leads already downloaded")
+    p.add_argument("--new", type=int, default=100, help="leads since the last download")
+    p.set_defaults(fn=bench_delta_export)
+
+    p = sub.add_parser("export-api", help="/api/leads/export NDJSON/CSV streams vs the xlsx download")
+    p.add_argument("--rows", type=int, default=100000)
+    p.add_argument("--partitions", type=int, default=4)
+    p.set_defaults(fn=bench_export_api)
+
+    args = parser.parse_args()
+    cwd = os.getcwd()
+    try:
+        args.fn(args)
+    finally:
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
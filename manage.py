@@ -0,0 +1,498 @@
+"""
+Build and maintenance commands for the PARMIS site.
+
+Run from the repo root:
+
+    python manage.py build-assets          # responsive WebP/AVIF sets + manifest
+    python manage.py build-css             # purged Tailwind stylesheet (needs the tailwindcss CLI)
+    python manage.py vendor-js             # pinned GSAP/ScrollTrigger/htmx into static/vendor
+    python manage.py prerender --parallel  # static export of every public GET route into dist/
+    python manage.py rebuild-rollups       # recount the dashboard's lead rollups from leads
+    python manage.py export-token crm-sync # bearer token for /api/leads/export
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ASSET_WIDTHS = [160, 320, 480, 640, 960, 1280, 1920]
+ASSET_FORMATS = {
+    # format -> Pillow save options
+    "avif": {"quality": 55, "speed": 6},
+    "webp": {"quality": 78, "method": 6},
+}
+SOURCE_EXTS = (".png", ".jpg", ".jpeg")
+
+
+# -----------------------------
+# build-assets
+# -----------------------------
+def _build_dir() -> str:
+    import app
+
+    return os.path.join("static", app.ASSET_BUILD_DIR)
+
+
+def _iter_sources():
+    build_dir = _build_dir()
+    for root, dirs, files in os.walk("static"):
+        if os.path.abspath(root).startswith(os.path.abspath(build_dir)):
+            continue
+        for name in sorted(files):
+            if name.lower().endswith(SOURCE_EXTS):
+                yield os.path.join(root, name)
+
+
+def build_assets(args: argparse.Namespace) -> None:
+    """
+    Resizes every PNG/JPEG under static/ into width-stepped WebP/AVIF files in
+    static/build/ and writes static/build/manifest.json, which app.responsive_img
+    turns into <picture>/srcset markup. Unchanged sources are skipped.
+    """
+    try:
+        from PIL import Image, features
+    except ImportError:
+        sys.exit("build-assets needs Pillow: pip install pillow")
+
+    import app
+
+    build_dir = _build_dir()
+    manifest_path = os.path.join(build_dir, "manifest.json")
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+
+    formats = {fmt: opts for fmt, opts in ASSET_FORMATS.items() if features.check(fmt)}
+    skipped_formats = sorted(set(ASSET_FORMATS) - set(formats))
+    if skipped_formats:
+        print(f"note: this Pillow build can't write {', '.join(skipped_formats)}; skipping")
+
+    manifest: dict[str, dict] = {}
+    for src in _iter_sources():
+        url = "/" + src.replace(os.sep, "/")
+        st = os.stat(src)
+        entry = previous.get(url)
+        if (
+            not args.force
+            and entry
+            and entry.get("source_mtime_ns") == st.st_mtime_ns
+            and set(entry.get("variants", {})) == set(formats)
+            and all(os.path.exists(v["url"].lstrip("/")) for vs in entry["variants"].values() for v in vs)
+        ):
+            manifest[url] = entry
+            continue
+
+        with Image.open(src) as im:
+            im.load()
+            width, height = im.size
+            stem = os.path.splitext(os.path.relpath(src, "static"))[0]
+            steps = [w for w in ASSET_WIDTHS if w < width] + [width]
+            variants: dict[str, list[dict]] = {fmt: [] for fmt in formats}
+            for w in steps:
+                h = round(height * w / width)
+                resized = im if w == width else im.resize((w, h), Image.LANCZOS)
+                for fmt, opts in formats.items():
+                    out = os.path.join(build_dir, f"{stem}-{w}.{fmt}")
+                    os.makedirs(os.path.dirname(out), exist_ok=True)
+                    resized.save(out, format=fmt.upper(), **opts)
+                    variants[fmt].append({
+                        "w": w,
+                        "url": "/" + out.replace(os.sep, "/"),
+                        "bytes": os.path.getsize(out),
+                    })
+        manifest[url] = {
+            "width": width,
+            "height": height,
+            "bytes": st.st_size,
+            "source_mtime_ns": st.st_mtime_ns,
+            "variants": variants,
+        }
+        print(f"built {url} ({len(steps)} widths x {len(formats)} formats)")
+
+    os.makedirs(build_dir, exist_ok=True)
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, manifest_path)
+    print(f"wrote {manifest_path} ({len(manifest)} images)")
+
+    _report_bytes_saved(app, manifest)
+
+
+REPORT_MOBILE_WIDTH = 720  # ~360 CSS px card at 2x DPR
+
+
+def _variant_for(entry: dict, target_w: int) -> dict:
+    # What a browser picks from srcset: the smallest candidate at least target_w
+    # wide, in the first format it supports (AVIF is listed first).
+    for fmt in ASSET_FORMATS:
+        vs = entry["variants"].get(fmt)
+        if vs:
+            return next((v for v in vs if v["w"] >= target_w), vs[-1])
+    return {"bytes": entry["bytes"]}
+
+
+def _report_bytes_saved(app, manifest: dict) -> None:
+    # Per page: PNG bytes the old markup pulled vs what a phone (REPORT_MOBILE_WIDTH
+    # device px per image) and a desktop (full-size variant) pick from the srcset now.
+    print(f"\n{'page':<24} {'png KiB':>9} {'mobile KiB':>11} {'desktop KiB':>12}")
+    for key, fn in app._cached_pages.items():
+        html = bytes(fn(None).body).decode("utf-8")
+        path = next((r.path for r in app.app.routes if getattr(getattr(r, "endpoint", None), "__name__", "") == key), key)
+        before = mobile = desktop = 0
+        for src in sorted(set(re.findall(r'src="(/static/[^"?]+)', html))):
+            entry = manifest.get(src)
+            if not entry:
+                continue
+            before += entry["bytes"]
+            mobile += _variant_for(entry, REPORT_MOBILE_WIDTH)["bytes"]
+            desktop += _variant_for(entry, entry["width"])["bytes"]
+        if before:
+            print(f"{path:<24} {before / 1024:9.1f} {mobile / 1024:11.1f} {desktop / 1024:12.1f}")
+
+
+# -----------------------------
+# build-css
+# -----------------------------
+TAILWIND_VERSION = "3.4.17"  # what cdn.tailwindcss.com serves (v3 JIT)
+TAILWIND_INPUT = "@tailwind base;\n@tailwind components;\n@tailwind utilities;\n"
+
+
+def _tailwind_cmd() -> list[str]:
+    if os.getenv("TAILWIND_BIN"):
+        return [os.environ["TAILWIND_BIN"]]
+    if shutil.which("tailwindcss"):
+        return [shutil.which("tailwindcss")]
+    if shutil.which("npx"):
+        return ["npx", "--yes", f"tailwindcss@{TAILWIND_VERSION}"]
+    sys.exit(
+        "build-css needs the Tailwind v3 CLI: set TAILWIND_BIN to the standalone binary "
+        "(github.com/tailwindlabs/tailwindcss/releases) or install Node for npx"
+    )
+
+
+def _sizes(body: bytes) -> str:
+    out = f"{len(body) / 1024:.1f} KiB raw, {len(gzip.compress(body, 9)) / 1024:.1f} KiB gzip"
+    try:
+        import brotli
+
+        out += f", {len(brotli.compress(body, quality=11)) / 1024:.1f} KiB br"
+    except ImportError:
+        pass
+    return out
+
+
+def build_css(args: argparse.Namespace) -> None:
+    """
+    Compiles every Tailwind utility the site uses into static/build/tailwind.css.
+    Content is app.py itself (all templates and HTML fragments live there) plus
+    the rendered pages, so classes assembled at render time are picked up too.
+    page() links the file (fingerprinted, immutable) instead of the CDN script.
+    """
+    import app
+
+    out = app.TAILWIND_CSS_PATH
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        for key, fn in app._cached_pages.items():
+            with open(os.path.join(tmp, f"{key}.html"), "wb") as f:
+                f.write(bytes(fn(None).body))
+        with open(os.path.join(tmp, "admin_login.html"), "w", encoding="utf-8") as f:
+            f.write(app._admin_login_page("error"))
+        input_css = os.path.join(tmp, "input.css")
+        with open(input_css, "w", encoding="utf-8") as f:
+            f.write(TAILWIND_INPUT)
+
+        built = os.path.join(tmp, "tailwind.css")
+        cmd = _tailwind_cmd() + [
+            "--input", input_css,
+            "--output", built,
+            "--content", f"app.py,{tmp}/*.html",
+            "--minify",
+        ]
+        t0 = time.perf_counter()
+        subprocess.run(cmd, check=True)
+        elapsed = time.perf_counter() - t0
+        shutil.copyfile(built, out + ".tmp")
+    os.replace(out + ".tmp", out)
+
+    with open(out, "rb") as f:
+        css = f.read()
+    print(f"wrote {out} in {elapsed:.1f}s: {_sizes(css)}")
+    print(f"served as {app.static_url('/' + out.replace(os.sep, '/'))}")
+
+    if args.compare:
+        # Rough before/after: what every page view paid for the CDN JIT vs now.
+        try:
+            t0 = time.perf_counter()
+            with urllib.request.urlopen(app.TAILWIND_CDN, timeout=10) as resp:
+                cdn = resp.read()
+            fetch_ms = (time.perf_counter() - t0) * 1000
+            print(f"before: {app.TAILWIND_CDN} = {_sizes(cdn)}, fetched in {fetch_ms:.0f}ms, "
+                  "then compiles in the browser on every page view (render-blocking)")
+        except OSError as e:
+            print(f"before: couldn't fetch {app.TAILWIND_CDN} for comparison ({e})")
+        print("after:  one cacheable stylesheet, no runtime JS; subsequent views hit the browser cache")
+
+
+# -----------------------------
+# vendor-js
+# -----------------------------
+def vendor_js(args: argparse.Namespace) -> None:
+    """
+    Downloads the pinned third-party scripts in app.VENDOR_JS into static/vendor/
+    (commit them), rejecting any whose hash doesn't match its SRI pin. Once
+    present, page() serves them from the page's own deferred, SRI-pinned
+    /assets/ bundle instead of render-blocking CDN tags.
+    """
+    import app
+
+    os.makedirs(app.VENDOR_DIR, exist_ok=True)
+    bad = []
+    for name, (_, path, url, integrity) in app.VENDOR_JS.items():
+        if os.path.exists(path) and not args.force:
+            with open(path, "rb") as f:
+                ok = app.sri_matches(f.read(), integrity)
+            print(f"{name}: {path} already vendored{'' if ok else ' but does NOT match its pin'}")
+            if not ok:
+                bad.append(name)
+            continue
+        with urllib.request.urlopen(url, timeout=30) as resp:
+            body = resp.read()
+        if not app.sri_matches(body, integrity):
+            print(f"{name}: {url} does not match {integrity}; not vendored")
+            bad.append(name)
+            continue
+        with open(path + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(path + ".tmp", path)
+        print(f"{name}: {url} -> {path} ({_sizes(body)}) {integrity}")
+    if bad:
+        sys.exit(f"integrity check failed for: {', '.join(bad)}")
+
+
+# -----------------------------
+# prerender
+# -----------------------------
+PRERENDER_SKIP = ("/admin", "/api/")
+# Same-origin URLs referenced from rendered HTML/CSS/JS/SVG (src, srcset,
+# href, data-open, url(...)); followed so dist/ is self-contained.
+PRERENDER_REF = re.compile(r'(?<![\w/])/(?:static|assets|img)/[^"\'\s,()<>?]+(?:\?v=[0-9a-f]+)?')
+
+
+def _prerender_roots(app) -> list[str]:
+    paths = []
+    for route in app.app.routes:
+        if "GET" not in (getattr(route, "methods", None) or ()) or route.path.startswith(PRERENDER_SKIP):
+            continue
+        if not getattr(route, "include_in_schema", True):  # /docs, /openapi.json, ...
+            continue
+        if route.path == "/img/art/{seed}.svg":
+            paths += [f"/img/art/{seed}.svg" for seed in range(app.ART_VARIANTS)]
+        elif "{" not in route.path:
+            paths.append(route.path)
+    return paths
+
+
+def _dist_name(url: str) -> str:
+    path = url.split("?", 1)[0]
+    if path.endswith("/"):
+        path += "index.html"
+    elif "." not in path.rsplit("/", 1)[-1]:
+        path += "/index.html"
+    return path.lstrip("/")
+
+
+def _render(urls: list[str]) -> list[tuple[str, int, dict[str, str], bytes]]:
+    import app
+
+    return [(url, *app.asgi_get(url)) for url in urls]
+
+
+def _render_all(urls: list[str], pool: ProcessPoolExecutor | None) -> list[tuple[str, int, dict[str, str], bytes]]:
+    if pool is None:
+        return _render(urls)
+    chunk = max(1, len(urls) // (pool._max_workers * 4))
+    return [r for rs in pool.map(_render, [urls[i:i + chunk] for i in range(0, len(urls), chunk)]) for r in rs]
+
+
+def prerender(args: argparse.Namespace) -> None:
+    """
+    Renders every public GET route (pages, /learn/*, /img/*.svg incl. all art
+    seeds, robots.txt, sitemap.xml) plus the /assets and /static files they
+    reference into --out, with .gz/.br siblings and manifest.json, for serving
+    from nginx/object storage. Python is then only needed for /api/quote and
+    /admin. Each file is checked against a fresh live render of its URL; any
+    difference fails the command and leaves the previous --out untouched.
+    """
+    import app
+
+    roots = _prerender_roots(app)
+    tmp_out = args.out.rstrip("/") + ".tmp"
+    shutil.rmtree(tmp_out, ignore_errors=True)
+
+    t0 = time.perf_counter()
+    pool = ProcessPoolExecutor(args.parallel) if args.parallel else None
+    try:
+        rendered: dict[str, tuple[int, dict[str, str], bytes]] = {}
+        todo = roots
+        while todo:
+            for url, status, headers, body in _render_all(todo, pool):
+                rendered[url] = (status, headers, body)
+            found = []
+            for url in todo:
+                status, headers, body = rendered[url]
+                if headers.get("content-type", "").startswith(app.COMPRESSIBLE_TYPES):
+                    for ref in PRERENDER_REF.findall(body.decode("utf-8", "replace")):
+                        if ref not in rendered and ref not in found:
+                            found.append(ref)
+            todo = found
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    elapsed = time.perf_counter() - t0
+
+    bad = [f"{url} -> {status}" for url, (status, _, _) in rendered.items() if status != 200]
+    if bad:
+        sys.exit("prerender: non-200 responses:\n  " + "\n  ".join(bad))
+
+    manifest: dict[str, dict] = {}
+    total = 0
+    for url, (_, headers, body) in sorted(rendered.items()):
+        name = _dist_name(url)
+        if name in manifest:  # same file under another ?v=
+            continue
+        dest = os.path.join(tmp_out, *name.split("/"))
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(dest, "wb") as f:
+            f.write(body)
+        content_type = headers.get("content-type", "application/octet-stream")
+        encodings = {}
+        if content_type.startswith(app.COMPRESSIBLE_TYPES):
+            for encoding, data in app.compress_variants(body).items():
+                if encoding == "identity":
+                    continue
+                ext = ".gz" if encoding == "gzip" else ".br"
+                with open(dest + ext, "wb") as f:
+                    f.write(data)
+                encodings[encoding] = {"file": name + ext, "bytes": len(data)}
+        manifest[name] = {
+            "url": url.split("?", 1)[0],
+            "content_type": content_type,
+            "cache_control": headers.get("cache-control", app.CACHE_REVALIDATE),
+            "etag": headers.get("etag"),
+            "bytes": len(body),
+            "encodings": encodings,
+        }
+        total += len(body)
+    with open(os.path.join(tmp_out, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+    # Verify against the live app with the page cache dropped, so HTML pages
+    # are re-rendered rather than served from the cache that produced them.
+    app._page_cache.clear()
+    mismatches = []
+    for name, entry in manifest.items():
+        with open(os.path.join(tmp_out, *name.split("/")), "rb") as f:
+            on_disk = f.read()
+        status, _, live = app.asgi_get(entry["url"])
+        if status != 200 or live != on_disk:
+            mismatches.append(f"{entry['url']} ({status}, {len(live)} B live vs {len(on_disk)} B prerendered)")
+    if mismatches:
+        sys.exit(f"prerender: {len(mismatches)} file(s) differ from the live render, kept {tmp_out} "
+                 "for inspection:\n  " + "\n  ".join(mismatches))
+
+    shutil.rmtree(args.out, ignore_errors=True)
+    os.replace(tmp_out, args.out)
+    mode = f"{args.parallel} processes" if args.parallel else "serial"
+    print(f"wrote {len(manifest)} files ({total / 1024:.1f} KiB) from {len(roots)} routes to {args.out}/ "
+          f"in {elapsed:.2f}s ({mode}); all match the live render")
+
+
+# -----------------------------
+# rebuild-rollups
+# -----------------------------
+def rebuild_rollups(args: argparse.Namespace) -> None:
+    """
+    Recomputes lead_rollups from the leads table in one transaction, e.g.
+    after editing leads with triggers off or restoring an old backup. Page
+    views have no source to recount from and are left as they are.
+    """
+    import app
+
+    app.init_db()
+    t0 = time.perf_counter()
+    with app.db_connection() as con:
+        con.execute("BEGIN IMMEDIATE")
+        for sql in app.ROLLUP_REBUILD_SQL:
+            con.execute(sql)
+        con.commit()
+        leads, rows = con.execute(
+            "SELECT (SELECT count(*) FROM leads), (SELECT count(*) FROM lead_rollups)"
+        ).fetchone()
+    print(f"rebuilt {rows} rollup rows from {leads} leads in {time.perf_counter() - t0:.2f}s")
+
+
+# -----------------------------
+# export-token
+# -----------------------------
+def export_token(args: argparse.Namespace) -> None:
+    """Prints a signed bearer token for /api/leads/export (needs the server's ADMIN_SECRET_KEY)."""
+    import app
+
+    if not app.ADMIN_SECRET_KEY:
+        print("warning: ADMIN_SECRET_KEY is unset; this token only works against a dev server", file=sys.stderr)
+    token = app._make_export_token(args.client, int(args.days * 86400))
+    print(token)
+    print(f"\n  curl --compressed -H 'Authorization: Bearer {token}' \\\n"
+          f"    'https://<host>/api/leads/export?format=ndjson&after_id=0'", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("build-assets", help="responsive WebP/AVIF image sets + manifest")
+    p.add_argument("--force", action="store_true", help="rebuild even if sources are unchanged")
+    p.set_defaults(fn=build_assets)
+
+    p = sub.add_parser("build-css", help="purged, minified Tailwind stylesheet replacing the CDN JIT")
+    p.add_argument("--compare", action="store_true", help="also measure the CDN script it replaces")
+    p.set_defaults(fn=build_css)
+
+    p = sub.add_parser("vendor-js", help="download pinned GSAP/ScrollTrigger/htmx into static/vendor")
+    p.add_argument("--force", action="store_true", help="re-download files that already exist")
+    p.set_defaults(fn=vendor_js)
+
+    p = sub.add_parser("prerender", help="render public GET routes to static files + manifest")
+    p.add_argument("--out", default="dist")
+    p.add_argument("--parallel", type=int, nargs="?", const=os.cpu_count() or 2, default=0,
+                   metavar="N", help="render in a pool of N processes (default: CPU count)")
+    p.set_defaults(fn=prerender)
+
+    p = sub.add_parser("rebuild-rollups", help="recount the dashboard's lead rollups from the leads table")
+    p.set_defaults(fn=rebuild_rollups)
+
+    p = sub.add_parser("export-token", help="signed bearer token for the /api/leads/export job API")
+    p.add_argument("client", help="name of the job using it, logged with each export")
+    p.add_argument("--days", type=float, default=90, help="validity (rotate ADMIN_SECRET_KEY to revoke all)")
+    p.set_defaults(fn=export_token)
+
+    args = parser.parse_args()
+    args.fn(args)
+
+
+if __name__ == "__main__":
+    main()
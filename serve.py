@@ -0,0 +1,178 @@
+"""
+Production launcher: a pre-forking uvicorn supervisor.
+
+The parent imports the app and renders every cached page, asset bundle and
+generated SVG once, then forks the workers, so they all start warm and share
+those bytes copy-on-write. (uvicorn --workers spawns fresh interpreters that
+each re-import and re-render everything.) Workers are recycled after
+--max-requests and respawned when they exit; a recycled worker leaves the
+final leads.xlsx compaction to the others, so it exits and is replaced at once.
+
+    python serve.py                              # $PORT, $WEB_CONCURRENCY or one worker per CPU
+    python serve.py --workers 4 --max-requests 5000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import importlib.util
+import logging
+import os
+import random
+import signal
+import socket
+import time
+
+import uvicorn
+
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "0"))  # 0 = one per available CPU
+MAX_REQUESTS = int(os.getenv("MAX_REQUESTS", "10000"))  # recycle a worker after this many; 0 = never
+# Extra 0..jitter requests per worker so they don't all recycle at once; default 10%.
+MAX_REQUESTS_JITTER = os.getenv("MAX_REQUESTS_JITTER")
+RESPAWN_BACKOFF_SECONDS = 1.0  # for workers that die right after starting
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def default_workers() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))  # respects taskset/cgroup CPU pinning
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return max(1, cpus)
+
+
+def preload():
+    """Imports app.py and fills its render caches; returns the module."""
+    import app
+
+    app.warm_render_caches()
+    # Move everything allocated so far into the permanent generation so the
+    # workers' garbage collections don't touch (and un-share) those pages.
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _config(asgi_app, args: argparse.Namespace) -> uvicorn.Config:
+    return uvicorn.Config(
+        asgi_app,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        lifespan="on",
+        log_level=args.log_level,
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        backlog=args.backlog,
+    )
+
+
+class _WorkerServer(uvicorn.Server):
+    async def on_tick(self, counter: int) -> bool:
+        exiting = await super().on_tick(counter)
+        if exiting and not self.should_exit:  # --max-requests reached, not a signal
+            import app
+
+            app.mark_recycling()
+        return exiting
+
+
+def _spawn(config: uvicorn.Config, sock: socket.socket, args: argparse.Namespace, slot: int) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    # Worker. Each gets its own jitter draw, metrics row and lifespan (DB pool,
+    # lead writer, compactor threads), started only after the fork. A respawned
+    # worker takes over its predecessor's row, so counters stay monotonic.
+    random.seed()
+    import app
+
+    app.set_metrics_slot(slot)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, signal.SIG_DFL)
+    if args.max_requests:
+        config.limit_max_requests = args.max_requests + random.randint(0, args.max_requests_jitter)
+    code = 0
+    try:
+        _WorkerServer(config).run(sockets=[sock])
+    except BaseException:
+        logger.exception("worker %d crashed", os.getpid())
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=WORKERS or default_workers())
+    parser.add_argument("--max-requests", type=int, default=MAX_REQUESTS)
+    parser.add_argument("--max-requests-jitter", type=int, default=None)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    if args.max_requests_jitter is None:
+        args.max_requests_jitter = int(MAX_REQUESTS_JITTER) if MAX_REQUESTS_JITTER else args.max_requests // 10
+
+    t0 = time.perf_counter()
+    app = preload()
+    if args.workers > app.METRICS_MAX_WORKERS:
+        parser.error(f"--workers is limited to METRICS_MAX_WORKERS ({app.METRICS_MAX_WORKERS})")
+    preload_ms = (time.perf_counter() - t0) * 1000
+    config = _config(app.app, args)
+    logger.info("preloaded app and %d pages in %.0fms", len(app._page_cache), preload_ms)
+    sock = _bind(args.host, args.port, args.backlog)
+    logger.info(
+        "pre-forking %d workers on %s:%d (loop=%s, http=%s, max_requests=%s)",
+        args.workers, args.host, args.port, config.loop, config.http, args.max_requests or "off",
+    )
+
+    workers: dict[int, tuple[int, float]] = {}  # pid -> (metrics slot, started)
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for slot in range(args.workers):
+        workers[_spawn(config, sock, args, slot)] = (slot, time.monotonic())
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        worker = workers.pop(pid, None)
+        if stopping or worker is None:
+            continue
+        slot, started = worker
+        code = os.waitstatus_to_exitcode(status)
+        if code == 0:
+            logger.info("worker %d recycled after max requests", pid)
+        else:
+            logger.warning("worker %d exited with %d; respawning", pid, code)
+            if time.monotonic() - started < RESPAWN_BACKOFF_SECONDS:
+                time.sleep(RESPAWN_BACKOFF_SECONDS)
+        workers[_spawn(config, sock, args, slot)] = (slot, time.monotonic())
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,10 @@
 #!/usr/bin/env bash
-uvicorn app:app --host 0.0.0.0 --port $PORT
\ No newline at end of file
+# Image sets are built at deploy time; on boot, only rebuild when there is no
+# manifest yet or a source image under static/ is newer than it.
+manifest=static/build/manifest.json
+if [ ! -f "$manifest" ] || [ -n "$(find static -path static/build -prune -o \
+        \( -iname '*.png' -o -iname '*.jpg' -o -iname '*.jpeg' \) -newer "$manifest" -print -quit)" ]; then
+    python manage.py build-assets
+fi
+# Pre-forked workers sharing a warm render cache; WEB_CONCURRENCY / MAX_REQUESTS tune it.
+exec python serve.py --host 0.0.0.0 --port $PORT